@@ -0,0 +1,400 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Colocated execution: run a linked graph in one process and event loop.
+
+Every service instance is created locally. Attributes declared with
+``depends()`` become direct calls into the target instance's endpoints, and
+``dynamo_context["runtime"]`` is replaced by a local runtime whose clients
+(``random``, ``round_robin``, ``direct``, ``instance_ids``) dispatch to local
+instances. No etcd, NATS or network hop is involved, so a graph can run
+offline for benchmarks and tests. Combine with ``wire_codec: "local"`` to
+also skip serialization between components.
+
+    python -m components.colocated module:RootService -f config.yaml \\
+        --service module:Service=replicas --set Section.key=value \\
+        --request '{...}'
+
+This module lives in ``basics/common`` and is linked into each example's
+``components`` package, so it is imported as ``components.colocated``.
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+import types
+import typing
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_instance_ids = itertools.count(1)
+
+
+def _inner(svc):
+    """User class behind a @service wrapper"""
+    return getattr(svc, "inner", svc)
+
+
+def _address(svc) -> tuple[str, str]:
+    if hasattr(svc, "dynamo_address"):
+        return tuple(svc.dynamo_address())
+    return "local", _inner(svc).__name__
+
+
+def _dependencies(svc) -> Dict[str, Any]:
+    """Map of attribute name to target service for each depends() declaration"""
+    deps = {}
+    for cls in reversed(_inner(svc).__mro__):
+        for name, value in vars(cls).items():
+            target = getattr(value, "on", None)
+            if target is not None and type(value).__name__.endswith("Dependency"):
+                deps[name] = target
+    return deps
+
+
+def _bind(instance, name: str):
+    """Bound endpoint function, unwrapping @endpoint()/@api() decorators"""
+    attr = inspect.getattr_static(instance, name)
+    func = getattr(attr, "func", attr)
+    if not callable(func):
+        raise AttributeError(f"{type(instance).__name__}.{name} is not an endpoint")
+    return types.MethodType(func, instance)
+
+
+def _hooks(instance, kind: str) -> list:
+    """Methods marked with @async_on_start ("startup") or @async_on_shutdown ("shutdown")"""
+    hooks = []
+    for cls in reversed(type(instance).__mro__):
+        for value in vars(cls).values():
+            func = getattr(value, "func", value)
+            if getattr(func, f"__dynamo_{kind}_hook__", False) or getattr(
+                func, f"__bentoml_{kind}_hook__", False
+            ):
+                hooks.append(types.MethodType(func, instance))
+    return hooks
+
+
+async def _stream(instance, endpoint: str, request):
+    """Call an endpoint and stream its results, whether it yields or returns"""
+    result = _bind(instance, endpoint)(request)
+    if inspect.isawaitable(result):
+        result = await result
+    result = getattr(result, "body_iterator", result)
+    if hasattr(result, "aclose"):
+        async with aclosing(result) as stream:
+            async for item in stream:
+                yield item
+    elif hasattr(result, "__aiter__"):
+        async for item in result:
+            yield item
+    else:
+        yield result
+
+
+class LocalResponse:
+    """Stand-in for a runtime response; data() returns the yielded object"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def data(self):
+        return self._data
+
+
+class LocalClient:
+    """Runtime client that dispatches to in-process instances of one component"""
+
+    def __init__(self, instances: Dict[int, Any], endpoint: str):
+        self.instances = instances
+        self.endpoint = endpoint
+        self._next = 0
+
+    def instance_ids(self) -> List[int]:
+        return list(self.instances)
+
+    async def wait_for_instances(self) -> List[int]:
+        return self.instance_ids()
+
+    def _pick(self, instance_id: Optional[int] = None):
+        if instance_id is not None:
+            if instance_id not in self.instances:
+                raise ValueError(
+                    f"No local instance {instance_id} for endpoint '{self.endpoint}'"
+                )
+            return self.instances[instance_id]
+        if not self.instances:
+            raise ValueError(f"No local instances for endpoint '{self.endpoint}'")
+        return None
+
+    async def _responses(self, instance, request):
+        async for item in _stream(instance, self.endpoint, request):
+            yield LocalResponse(item)
+
+    async def direct(self, request, instance_id: int):
+        return self._responses(self._pick(instance_id), request)
+
+    async def random(self, request):
+        self._pick()
+        return self._responses(random.choice(list(self.instances.values())), request)
+
+    async def round_robin(self, request):
+        self._pick()
+        ids = self.instance_ids()
+        instance = self.instances[ids[self._next % len(ids)]]
+        self._next += 1
+        return self._responses(instance, request)
+
+    generate = round_robin
+
+
+class LocalDependency:
+    """Replaces a depends() client: endpoint calls stream straight from a local instance"""
+
+    def __init__(self, instances: Dict[int, Any]):
+        self._instances = instances
+        self._next = 0
+
+    def __getattr__(self, endpoint: str):
+        def call(request):
+            ids = list(self._instances)
+            instance = self._instances[ids[self._next % len(ids)]]
+            self._next += 1
+            return _stream(instance, endpoint, request)
+
+        return call
+
+
+class _Endpoint:
+    def __init__(
+        self, runtime: "LocalRuntime", namespace: str, component: str, name: str
+    ):
+        self.runtime, self.namespace, self.component_name, self.name = (
+            runtime,
+            namespace,
+            component,
+            name,
+        )
+
+    async def client(self) -> LocalClient:
+        instances = self.runtime.instances.get((self.namespace, self.component_name))
+        if instances is None:
+            name = f"{self.namespace}/{self.component_name}"
+            raise ValueError(f"Component {name} is not part of the colocated graph")
+        return LocalClient(instances, self.name)
+
+
+class _Component:
+    def __init__(self, runtime: "LocalRuntime", namespace: str, name: str):
+        self.runtime, self.namespace_name, self.name = runtime, namespace, name
+
+    def endpoint(self, name: str) -> _Endpoint:
+        return _Endpoint(self.runtime, self.namespace_name, self.name, name)
+
+
+class _Namespace:
+    def __init__(self, runtime: "LocalRuntime", name: str):
+        self.runtime, self.name = runtime, name
+
+    def component(self, name: str) -> _Component:
+        return _Component(self.runtime, self.name, name)
+
+
+class LocalRuntime:
+    """Minimal runtime exposing namespace().component().endpoint().client()"""
+
+    def __init__(self):
+        self.instances: Dict[tuple[str, str], Dict[int, Any]] = {}
+
+    def namespace(self, name: str) -> _Namespace:
+        return _Namespace(self, name)
+
+
+class ColocatedGraph:
+    """Instantiate a service graph in the current process.
+
+    ``root`` and everything it reaches through ``depends()`` get one instance
+    each. ``services`` adds components that are only reached through the
+    runtime (for example workers behind a router) and sets replica counts.
+    """
+
+    def __init__(self, root, services: Optional[Dict[Any, int]] = None):
+        # Lets components accept wire codecs that only work within one process
+        os.environ["DYNAMO_COLOCATED"] = "1"
+        self.root = root
+        self.replicas = dict(services or {})
+        self.runtime = LocalRuntime()
+        self.order: List[Any] = []
+        self.instances: Dict[Any, Dict[int, Any]] = {}
+        self._started: List[Any] = []
+
+    def _collect(self, svc, seen: set):
+        """Depth-first so dependencies come before their dependents"""
+        if svc in seen:
+            return
+        seen.add(svc)
+        for target in _dependencies(svc).values():
+            self._collect(target, seen)
+        self.order.append(svc)
+
+    def _build(self):
+        seen: set = set()
+        for svc in self.replicas:
+            self._collect(svc, seen)
+        self._collect(self.root, seen)
+        for svc in self.order:
+            self.instances[svc] = self.runtime.instances.setdefault(_address(svc), {})
+        for svc in self.order:
+            overrides = {
+                name: LocalDependency(self.instances[target])
+                for name, target in _dependencies(svc).items()
+            }
+            overrides["__module__"] = _inner(svc).__module__
+            cls = type(_inner(svc).__name__, (_inner(svc),), overrides)
+            for _ in range(self.replicas.get(svc, 1)):
+                self.instances[svc][next(_instance_ids)] = cls()
+
+    async def start(self):
+        from dynamo.sdk import dynamo_context
+
+        dynamo_context["runtime"] = self.runtime
+        self._build()
+        for svc in self.order:
+            for instance in self.instances[svc].values():
+                for hook in _hooks(instance, "startup"):
+                    await hook()
+                self._started.append(instance)
+        started = ", ".join(
+            f"{_inner(svc).__name__}x{len(self.instances[svc])}" for svc in self.order
+        )
+        logger.info(f"Colocated graph started: {started}")
+        return self
+
+    async def stop(self):
+        while self._started:
+            instance = self._started.pop()
+            for hook in _hooks(instance, "shutdown"):
+                try:
+                    await hook()
+                except Exception as e:
+                    logger.warning(f"Shutdown hook {hook.__name__} failed: {e}")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def instance(self, svc):
+        """First instance of a service in the graph"""
+        return next(iter(self.instances[svc].values()))
+
+    def stream(self, svc, endpoint: str, request):
+        """Stream an endpoint of a service, e.g. graph.stream(Processor, "generate", payload)"""
+        return LocalDependency(self.instances[svc]).__getattr__(endpoint)(request)
+
+
+def _parse_request(svc, endpoint: str, raw: str):
+    """Build an endpoint's request argument from JSON, using its pydantic annotation"""
+    func = getattr(inspect.getattr_static(_inner(svc), endpoint), "func", None)
+    func = func or getattr(_inner(svc), endpoint)
+    hints = typing.get_type_hints(func)
+    params = [p for p in inspect.signature(func).parameters if p != "self"]
+    model = hints.get(params[0]) if params else None
+    if hasattr(model, "model_validate_json"):
+        return model.model_validate_json(raw)
+    return raw
+
+
+def _load(spec: str):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def load_service_config(config_file: Optional[str], overrides: List[str]):
+    """Expose a YAML config (plus Section.key=value overrides) to ServiceConfig"""
+    config: Dict[str, Dict[str, Any]] = {}
+    if config_file:
+        import yaml
+
+        with open(config_file) as f:
+            config = yaml.safe_load(f) or {}
+    for override in overrides:
+        key, _, value = override.partition("=")
+        section, _, option = key.partition(".")
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            pass
+        config.setdefault(section, {})[option] = value
+    os.environ["DYNAMO_SERVICE_CONFIG"] = json.dumps(config)
+
+
+async def _run(args):
+    root = _load(args.graph)
+    services = {}
+    for spec in args.service:
+        spec, _, count = spec.partition("=")
+        services[_load(spec)] = int(count or 1)
+    async with ColocatedGraph(root, services) as graph:
+        for _ in range(args.repeat):
+            request = _parse_request(root, args.api, args.request)
+            async for chunk in graph.stream(root, args.api, request):
+                text = chunk.decode() if isinstance(chunk, bytes) else str(chunk)
+                print(text, end="" if text.endswith("\n") else "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a linked graph in one process")
+    parser.add_argument("graph", help="Root service, e.g. components.graph:Frontend")
+    parser.add_argument(
+        "-f", "--config-file", help="Same YAML config used with dynamo serve"
+    )
+    parser.add_argument(
+        "--service",
+        action="append",
+        default=[],
+        help="Extra service reached through the runtime, as module:Class[=replicas]",
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        help="Config override as Section.key=value",
+    )
+    parser.add_argument(
+        "--api", default="generate", help="Endpoint of the root service to call"
+    )
+    parser.add_argument("--request", required=True, help="Request body as JSON")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    load_service_config(args.config_file, args.overrides)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Request deadlines carried across pipeline stages.
+
+Lives in ``basics/common`` and is linked into each example's ``components``
+package as ``components.deadlines``.
+"""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised by a stage that drops a request because its deadline has passed.
+
+    Ending the stream with an error, rather than just stopping, keeps an
+    empty or truncated result from looking like a complete one to callers
+    such as the response cache.
+    """
+
+
+def deadline_after(timeout_ms: Optional[float]) -> Optional[float]:
+    """Absolute deadline ``timeout_ms`` from now, or None for no deadline"""
+    if timeout_ms is None:
+        return None
+    return time.time() + timeout_ms / 1000
+
+
+def expired(deadline: Optional[float]) -> bool:
+    """Whether a request's deadline has passed; requests without one never expire.
+
+    Deadlines are wall-clock times so they can cross hosts, which assumes
+    clocks are kept in sync (e.g. NTP).
+    """
+    return deadline is not None and time.time() >= deadline
@@ -0,0 +1,177 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup readiness barrier and timeline for components that wait for workers.
+
+Lives in ``basics/common`` and is linked into each example's ``components``
+package as ``components.readiness``.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessTimeout(TimeoutError):
+    """Raised when too few workers are ready when the startup timeout expires"""
+
+
+@dataclass
+class StartupPhase:
+    component: str
+    phase: str
+    started_at: float
+    duration: Optional[float] = None
+
+
+class StartupTimeline:
+    """Records how long each component spent in each startup phase"""
+
+    def __init__(self):
+        self.origin = time.monotonic()
+        self.phases: List[StartupPhase] = []
+
+    @contextmanager
+    def span(self, component: str, phase: str):
+        entry = StartupPhase(component, phase, time.monotonic() - self.origin)
+        self.phases.append(entry)
+        start = time.monotonic()
+        try:
+            yield entry
+        finally:
+            entry.duration = time.monotonic() - start
+
+    @asynccontextmanager
+    async def phase(self, component: str, phase: str):
+        with self.span(component, phase) as entry:
+            yield entry
+
+    def mark(self, component: str, phase: str) -> StartupPhase:
+        """Record an instant, such as the moment a component became ready"""
+        entry = StartupPhase(component, phase, time.monotonic() - self.origin, 0.0)
+        self.phases.append(entry)
+        return entry
+
+    def as_dicts(self) -> List[dict]:
+        return [asdict(entry) for entry in self.phases]
+
+    def log(self, component: Optional[str] = None):
+        for entry in self.phases:
+            if component is None or entry.component == component:
+                duration = (
+                    f"{entry.duration:.3f}s"
+                    if entry.duration is not None
+                    else "running"
+                )
+                logger.info(
+                    f"Startup {entry.component}.{entry.phase}: "
+                    f"began at +{entry.started_at:.3f}s, took {duration}"
+                )
+
+
+# One timeline per process, shared by every component started in it
+timeline = StartupTimeline()
+
+
+class ReadinessBarrier:
+    """Wakes waiters as soon as a client sees the required number of workers.
+
+    The client's instance list is kept current by the runtime's discovery
+    watch, so reading it is cheap; the barrier checks it every
+    ``check_interval`` seconds and releases all waiters the moment the count
+    is reached instead of sleeping a fixed poll period. ``min_ready`` allows
+    partial readiness: after ``timeout`` the barrier opens with at least that
+    many workers instead of failing.
+    """
+
+    def __init__(
+        self,
+        client,
+        required: int,
+        timeout: Optional[float] = None,
+        min_ready: Optional[int] = None,
+        check_interval: float = 0.05,
+    ):
+        self.client = client
+        self.required = required
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.min_ready = required if min_ready is None else min(min_ready, required)
+        self.check_interval = check_interval
+        self.ready = asyncio.Event()
+        self.worker_ids: List[int] = []
+
+    def _check(self) -> bool:
+        self.worker_ids = list(self.client.instance_ids())
+        if len(self.worker_ids) >= self.required:
+            self.ready.set()
+        return self.ready.is_set()
+
+    async def _watch(self):
+        # Wake on the first instance without polling when the client supports it
+        if not self.worker_ids and hasattr(self.client, "wait_for_instances"):
+            await self.client.wait_for_instances()
+        last = -1
+        while not self._check():
+            if len(self.worker_ids) != last:
+                last = len(self.worker_ids)
+                logger.info(f"Waiting for workers: {last}/{self.required} ready")
+            await asyncio.sleep(self.check_interval)
+
+    async def wait(self) -> List[int]:
+        """Return ready worker ids; raise ReadinessTimeout if too few are ready"""
+        if self._check():
+            return self.worker_ids
+        watcher = asyncio.create_task(self._watch())
+        try:
+            await asyncio.wait_for(asyncio.shield(self.ready.wait()), self.timeout)
+        except asyncio.TimeoutError:
+            self._check()
+            if len(self.worker_ids) < self.min_ready:
+                raise ReadinessTimeout(
+                    f"{len(self.worker_ids)}/{self.required} workers ready after "
+                    f"{self.timeout}s (need at least {self.min_ready})"
+                )
+            ready = f"{len(self.worker_ids)}/{self.required}"
+            logger.warning(f"Starting with {ready} workers after {self.timeout}s")
+        finally:
+            watcher.cancel()
+        return self.worker_ids
+
+
+async def check_required_workers(
+    workers_client,
+    required_workers: int,
+    tag: str = "",
+    timeout: Optional[float] = None,
+    min_ready: Optional[int] = None,
+):
+    """Wait until the minimum number of workers are ready.
+
+    Returns as soon as ``required_workers`` are visible. With ``timeout`` set,
+    gives up after that many seconds, returning if at least ``min_ready``
+    workers are up and raising ReadinessTimeout otherwise.
+    """
+    barrier = ReadinessBarrier(
+        workers_client, required_workers, timeout=timeout, min_ready=min_ready
+    )
+    async with timeline.phase(tag.strip("[]") or "workers", "wait_for_workers"):
+        worker_ids = await barrier.wait()
+    logger.info(f"{tag} Workers ready: {worker_ids}")
+    return worker_ids
@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers for the response streams passed between pipeline hops.
+
+Lives in ``basics/common`` and is linked into each example's ``components``
+package as ``components.streams``.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def close_stream(stream):
+    """Close an upstream response stream so the hop producing it stops working.
+
+    Python async generators (``depends()`` clients, local wrappers) are closed
+    with ``aclose``, which runs down to the client call they are iterating.
+    Runtime client streams end the remote request when closed or released.
+    """
+    close = getattr(stream, "aclose", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        logger.debug(f"Error closing upstream stream: {e}")
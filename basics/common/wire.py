@@ -0,0 +1,183 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Wire codecs for inter-component messages, shared by the examples.
+
+Each example maps codec names to its own message types in
+``components/codec.py``; this module holds the codecs themselves and the
+graph-level ``wire_codec`` setting. It lives in ``basics/common`` and is
+linked into each example's ``components`` package as ``components.wire``.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Union
+
+import msgspec
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Raised by decode() for malformed or invalid payloads, whichever codec is used
+DECODE_ERRORS = (ValidationError, msgspec.DecodeError)
+
+# Set by components.colocated while a graph runs in one process
+COLOCATED_ENV = "DYNAMO_COLOCATED"
+
+
+class Codec:
+    """Encodes and decodes one message type for inter-component transport"""
+
+    name = "base"
+    binary = False
+    # The Dynamo runtime sends request and response payloads as JSON, so
+    # codecs whose output is not text only work between colocated components
+    colocated_only = False
+
+    def new(self, **fields) -> Any:
+        """Build a message of this codec's type"""
+        raise NotImplementedError
+
+    def encode(self, message: Any) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        raise NotImplementedError
+
+    def replace(self, message: Any, **changes) -> Any:
+        """Copy of a message with some fields changed"""
+        raise NotImplementedError
+
+    def to_json(self, data: Union[str, bytes]) -> str:
+        """Render an encoded message as JSON text for the HTTP edge"""
+        return data.decode() if isinstance(data, bytes) else data
+
+
+class PydanticCodec(Codec):
+    """Pydantic models serialized as JSON strings (original wire format)"""
+
+    name = "pydantic"
+
+    def __init__(self, model):
+        self.model = model
+
+    def new(self, **fields):
+        return self.model(**fields)
+
+    def encode(self, message) -> str:
+        return message.model_dump_json()
+
+    def decode(self, data):
+        return self.model.model_validate_json(data)
+
+    def replace(self, message, **changes):
+        return message.model_copy(update=changes)
+
+
+class MsgspecJsonCodec(Codec):
+    """msgspec Structs serialized as JSON strings"""
+
+    name = "msgspec-json"
+
+    def __init__(self, struct):
+        self.struct = struct
+        self.encoder = msgspec.json.Encoder()
+        self.decoder = msgspec.json.Decoder(struct)
+
+    def new(self, **fields):
+        return self.struct(**fields)
+
+    def encode(self, message) -> str:
+        return self.encoder.encode(message).decode()
+
+    def decode(self, data):
+        return self.decoder.decode(data)
+
+    def replace(self, message, **changes):
+        return msgspec.structs.replace(message, **changes)
+
+
+class MsgpackCodec(MsgspecJsonCodec):
+    """msgspec Structs serialized as MessagePack bytes.
+
+    Only use this where the transport carries bytes unchanged.
+    """
+
+    name = "msgpack"
+    binary = True
+    colocated_only = True
+
+    def __init__(self, struct):
+        self.struct = struct
+        self.encoder = msgspec.msgpack.Encoder()
+        self.decoder = msgspec.msgpack.Decoder(struct)
+
+    def encode(self, message) -> bytes:
+        return self.encoder.encode(message)
+
+    def to_json(self, data) -> str:
+        return json.dumps(msgspec.to_builtins(self.decode(data)), separators=(",", ":"))
+
+
+class LocalCodec(MsgspecJsonCodec):
+    """msgspec Structs handed over as objects, with no serialization.
+
+    Only valid when every component runs in one process (colocated mode).
+    """
+
+    name = "local"
+    colocated_only = True
+
+    def encode(self, message):
+        return message
+
+    def decode(self, data):
+        return data if isinstance(data, self.struct) else super().decode(data)
+
+    def to_json(self, data) -> str:
+        return (
+            self.encoder.encode(data).decode()
+            if isinstance(data, self.struct)
+            else super().to_json(data)
+        )
+
+
+def wire_codec_setting(config, codecs: dict) -> str:
+    """The graph's wire_codec: ``Common.wire_codec``, checked against every section.
+
+    Sections may still set ``wire_codec`` themselves, but every value in the
+    config must agree, since each component encodes what the next decodes.
+    A codec that only works in one process falls back to ``msgspec-json``
+    outside colocated mode, the same in every component.
+    """
+    values = {
+        section: options["wire_codec"]
+        for section, options in config.items()
+        if isinstance(options, dict) and "wire_codec" in options
+    }
+    if len(set(values.values())) > 1:
+        found = ", ".join(
+            f"{section}={value}" for section, value in sorted(values.items())
+        )
+        raise ValueError(f"wire_codec must be the same in every section, found {found}")
+    name = next(iter(values.values()), "pydantic")
+    colocated_only = name in codecs and codecs[name][0].colocated_only
+    if colocated_only and not os.environ.get(COLOCATED_ENV):
+        logger.warning(
+            f"wire_codec '{name}' needs colocated mode, using 'msgspec-json'"
+        )
+        return "msgspec-json"
+    return name
@@ -13,14 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-import time
 
-from dynamo.runtime.logging import configure_dynamo_logging
-from dynamo.sdk import api, service
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from dynamo.runtime.logging import configure_dynamo_logging
+from dynamo.sdk import api, service
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,9 +61,9 @@ class Frontend:
         """Stream results from the pipeline."""
         logger.info(f"Frontend received: {request.text}")
 
-        def content_generator():
+        async def content_generator():
             for word in request.text.split(","):
-                time.sleep(1)
+                await asyncio.sleep(1)
                 yield f"Hello {word}!\n"
 
         return StreamingResponse(content_generator())
@@ -13,14 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-import time
+from contextlib import nullcontext
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from dynamo.runtime.logging import configure_dynamo_logging
 from dynamo.sdk import api, service
 from dynamo.sdk.lib.config import ServiceConfig
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
@@ -62,15 +64,21 @@ class Frontend:
         self.sleep_time = config.get("Frontend", {}).get("sleep_time", 1)
         logger.info(f"Frontend config sleep_time: {self.sleep_time}")
 
+        # 0 means no limit on concurrent streams
+        max_streams = config.get("Frontend", {}).get("max_concurrent_streams", 0)
+        self.stream_slots = asyncio.Semaphore(max_streams) if max_streams > 0 else None
+        logger.info(f"Frontend config max_concurrent_streams: {max_streams}")
+
     # alternative syntax: @endpoint(transports=[DynamoTransport.HTTP])
     @api()
     async def generate(self, request: RequestType):
         """Stream results from the pipeline."""
         logger.info(f"Frontend received: {request.text}")
 
-        def content_generator():
-            for word in request.text.split(","):
-                time.sleep(self.sleep_time)
-                yield f"{self.greeting} {word}!\n"
+        async def content_generator():
+            async with self.stream_slots or nullcontext():
+                for word in request.text.split(","):
+                    await asyncio.sleep(self.sleep_time)
+                    yield f"{self.greeting} {word}!\n"
 
         return StreamingResponse(content_generator())
@@ -0,0 +1 @@
+../../common/colocated.py
\ No newline at end of file
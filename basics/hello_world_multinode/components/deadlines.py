@@ -0,0 +1 @@
+../../common/deadlines.py
\ No newline at end of file
@@ -13,30 +13,62 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import time
 
+from components.codec import graph_codecs
+from components.deadlines import expired
 from components.processor import Processor
+from components.streams import close_stream
 from components.utils import GeneralRequest
 from fastapi.responses import StreamingResponse
 
-from dynamo.sdk import DYNAMO_IMAGE, depends, api, endpoint, service
+from dynamo.sdk import DYNAMO_IMAGE, api, depends, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
 
 logger = logging.getLogger(__name__)
 
+
 @service(
     dynamo={"namespace": "dynamo-demo"},
     image=DYNAMO_IMAGE,
 )
 class Frontend:
     processor = depends(Processor)
+
+    def __init__(self):
+        # HTTP stays on Pydantic; only inter-component messages use the wire codec
+        config = ServiceConfig.get_instance()
+        self.request_codec, self.response_codec = graph_codecs(config)
+        # Deadline for requests that do not bring their own
+        self.request_timeout_ms = config.get("Frontend", {}).get(
+            "request_timeout_ms", None
+        )
+
     # alternative syntax: @endpoint(transports=[DynamoTransport.HTTP])
     @api()
     async def generate(self, request: GeneralRequest):  # from request body keys
         """Stream results from the pipeline."""
         logger.info(f"-Frontend layer received: {request=}")
 
+        if request.deadline is None and self.request_timeout_ms is not None:
+            request.deadline = time.time() + self.request_timeout_ms / 1000
+
         async def content_generator():
-            async for response in self.processor.generate(request.model_dump_json()):
-                yield f"Frontend: {response}"
+            wire_request = self.request_codec.new(**request.model_dump())
+            responses = self.processor.generate(self.request_codec.encode(wire_request))
+            try:
+                async for response in responses:
+                    yield f"Frontend: {self.response_codec.to_json(response)}"
+            except Exception:
+                if not expired(request.deadline):
+                    raise
+                # Dropped at its deadline downstream: end with a marker, not a cut-off
+                logger.warning(f"Request {request.request_id} exceeded its deadline")
+                yield f"Frontend: {json.dumps({'error': 'deadline exceeded'})}"
+            finally:
+                # Runs when the HTTP client disconnects: stop the Processor and its worker
+                await close_stream(responses)
 
         return StreamingResponse(content_generator())
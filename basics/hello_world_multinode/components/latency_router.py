@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerLatency:
+    """Outstanding requests and decayed latency estimates for one worker"""
+
+    outstanding: int = 0
+    ttfc: Optional[float] = None  # seconds to first chunk
+    completion: Optional[float] = None  # seconds to last chunk
+    updated_at: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    errors: int = 0
+
+
+class LatencyTracker:
+    """Per-worker latency tracking for the least-outstanding and ewma-latency routers.
+
+    Each measurement is folded into an exponentially weighted average whose
+    weight depends on the time since the previous one: an estimate half a
+    ``decay`` period old counts for ~40%, so a node that changes speed is
+    noticed within seconds. While a slow worker receives no traffic its
+    estimate drifts back towards the fleet average, so it gets retried
+    instead of being starved forever.
+    """
+
+    def __init__(
+        self,
+        decay: float = 10.0,
+        error_penalty: float = 5.0,
+        seed: Optional[int] = None,
+    ):
+        self.decay = decay
+        self.error_penalty = error_penalty
+        self.workers: Dict[int, WorkerLatency] = {}
+        self.rng = random.Random(seed)
+
+    def sync(self, worker_ids: Iterable[int]):
+        """Track exactly the given workers"""
+        worker_ids = set(worker_ids)
+        for worker_id in worker_ids - self.workers.keys():
+            self.workers[worker_id] = WorkerLatency()
+        for worker_id in self.workers.keys() - worker_ids:
+            del self.workers[worker_id]
+
+    def _fold(self, current: Optional[float], sample: float, elapsed: float) -> float:
+        if current is None:
+            return sample
+        weight = 1 - math.exp(-elapsed / self.decay) if self.decay > 0 else 1.0
+        # Always give a new sample some weight, even back to back
+        weight = max(weight, 0.1)
+        return current + weight * (sample - current)
+
+    def fleet_average(self, metric: str = "completion") -> Optional[float]:
+        known = [
+            getattr(w, metric)
+            for w in self.workers.values()
+            if getattr(w, metric) is not None
+        ]
+        return sum(known) / len(known) if known else None
+
+    def estimate(
+        self, worker_id: int, now: Optional[float] = None, metric: str = "completion"
+    ) -> float:
+        """Expected ``metric`` (completion or ttfc); slow estimates relax to the average"""
+        worker = self.workers[worker_id]
+        fleet = self.fleet_average(metric)
+        value = getattr(worker, metric)
+        if value is None:
+            # Unmeasured workers look as good as the average so they get tried
+            return fleet or 0.0
+        if value <= fleet:
+            return value
+        now = time.monotonic() if now is None else now
+        relax = (
+            math.exp(-(now - worker.updated_at) / self.decay) if self.decay > 0 else 0.0
+        )
+        return fleet + (value - fleet) * relax
+
+    def _pick(self, candidates, score) -> Optional[int]:
+        if not candidates:
+            return None
+        best = min(score(wid) for wid in candidates)
+        return self.rng.choice([wid for wid in candidates if score(wid) == best])
+
+    def pick_least_outstanding(self, worker_ids: Iterable[int]) -> Optional[int]:
+        self.sync(worker_ids)
+        return self._pick(list(self.workers), lambda wid: self.workers[wid].outstanding)
+
+    def score(self, worker_id: int, now: Optional[float] = None) -> float:
+        """Expected time to a new request's first chunk on this worker.
+
+        The requests already sent to it finish first, then the new one takes
+        the worker's time to first chunk, which is what a streaming client
+        waits for.
+        """
+        now = time.monotonic() if now is None else now
+        outstanding = self.workers[worker_id].outstanding
+        return self.estimate(worker_id, now) * outstanding + self.estimate(
+            worker_id, now, "ttfc"
+        )
+
+    def pick_ewma(self, worker_ids: Iterable[int]) -> Optional[int]:
+        """Lowest expected time to first chunk, counting each worker's queue"""
+        self.sync(worker_ids)
+        now = time.monotonic()
+        return self._pick(list(self.workers), lambda wid: self.score(wid, now))
+
+    def start(self, worker_id: int):
+        if worker_id in self.workers:
+            self.workers[worker_id].outstanding += 1
+
+    def first_chunk(self, worker_id: int, elapsed: float):
+        worker = self.workers.get(worker_id)
+        if worker is not None:
+            worker.ttfc = self._fold(
+                worker.ttfc, elapsed, time.monotonic() - worker.updated_at
+            )
+
+    def finish(self, worker_id: int, elapsed: float, ok: bool = True):
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            return
+        now = time.monotonic()
+        worker.outstanding = max(worker.outstanding - 1, 0)
+        worker.requests += 1
+        if not ok:
+            worker.errors += 1
+            elapsed = max(elapsed, self.error_penalty)
+            # Charge time to first chunk as well, so an idle failing worker is not preferred
+            worker.ttfc = self._fold(worker.ttfc, elapsed, now - worker.updated_at)
+        worker.completion = self._fold(
+            worker.completion, elapsed, now - worker.updated_at
+        )
+        worker.updated_at = now
+
+    def cancel(self, worker_id: int):
+        """Forget an abandoned request without recording its latency"""
+        worker = self.workers.get(worker_id)
+        if worker is not None:
+            worker.outstanding = max(worker.outstanding - 1, 0)
+
+    def stats(self) -> Dict[int, dict]:
+        now = time.monotonic()
+        return {
+            worker_id: {
+                "outstanding": worker.outstanding,
+                "ttfc": worker.ttfc,
+                "completion": worker.completion,
+                "estimate": self.estimate(worker_id, now),
+                "score": self.score(worker_id, now),
+                "requests": worker.requests,
+                "errors": worker.errors,
+            }
+            for worker_id, worker in self.workers.items()
+        }
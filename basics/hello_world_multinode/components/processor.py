@@ -13,10 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import logging
+import random
 import socket
+import time
+from contextlib import aclosing
 
-from components.utils import GeneralRequest, GeneralResponse, check_required_workers
+from components.codec import DECODE_ERRORS, graph_codecs
+from components.deadlines import DeadlineExceeded, expired
+from components.latency_router import LatencyTracker
+from components.readiness import check_required_workers, timeline
+from components.streams import close_stream
+from components.utils import GeneralRequest
 from components.worker import DummyWorker
 
 from dynamo._core import Client
@@ -33,6 +43,8 @@ from dynamo.sdk.lib.dependency import DynamoClient
 
 logger = logging.getLogger(__name__)
 
+ROUTERS = ("random", "round-robin", "least-outstanding", "ewma-latency")
+
 
 @service(
     dynamo={"namespace": "dynamo-demo"},
@@ -54,23 +66,44 @@ class Processor:
         processor_config = config.get("Processor", {})
         self.hostname = socket.gethostname()
         self.min_workers = processor_config.get("min_worker", 1)
+        self.startup_timeout = processor_config.get("startup_timeout", 0)
+        self.min_ready_workers = processor_config.get("min_ready_workers", None)
         self.router = processor_config.get("router", "round-robin")
+        if self.router not in ROUTERS:
+            logger.warning(
+                f"Unknown router '{self.router}', defaulting to 'round-robin'"
+            )
+            self.router = "round-robin"
+        self.latency = LatencyTracker(
+            decay=processor_config.get("latency_decay", 10.0),
+            error_penalty=processor_config.get("error_penalty", 5.0),
+        )
+        self.relay_mode = processor_config.get("relay_mode", "parse")
+        self.validate_sample_rate = processor_config.get("validate_sample_rate", 0.0)
+        self.request_codec, self.response_codec = graph_codecs(config)
+        self.expired_requests = 0
 
     @async_on_start
     async def async_init(self):
-        runtime = dynamo_context["runtime"]
-        comp_ns, comp_name = DummyWorker.dynamo_address()  # type: ignore
-        self.worker_client = (
-            await runtime.namespace(comp_ns)
-            .component(comp_name)
-            .endpoint("generate")
-            .client()
-        )
+        async with timeline.phase("Processor", "async_init"):
+            runtime = dynamo_context["runtime"]
+            comp_ns, comp_name = DummyWorker.dynamo_address()  # type: ignore
+            self.worker_client = (
+                await runtime.namespace(comp_ns)
+                .component(comp_name)
+                .endpoint("generate")
+                .client()
+            )
 
-        await check_required_workers(
-            self.worker_client, self.min_workers, tag="processor"
-        )
+            await check_required_workers(
+                self.worker_client,
+                self.min_workers,
+                tag="processor",
+                timeout=self.startup_timeout,
+                min_ready=self.min_ready_workers,
+            )
         logger.info(f"----workers are all ready {self.worker_client.instance_ids()}")
+        timeline.log("Processor")
 
     async def _generate(
         self,
@@ -79,21 +112,103 @@ class Processor:
         raw_request.prompt = raw_request.prompt + "_ProcessedBy_" + self.hostname
         if self.router == "random":
             engine_generator = await self.worker_client.random(
-                raw_request.model_dump_json()
+                self.request_codec.encode(raw_request)
             )
         elif self.router == "round-robin":
             engine_generator = await self.worker_client.round_robin(
-                raw_request.model_dump_json()
+                self.request_codec.encode(raw_request)
             )
+        else:
+            async with aclosing(self._generate_direct(raw_request)) as responses:
+                async for response in responses:
+                    yield response
+            return
+
+        try:
+            async for resp in engine_generator:
+                yield resp.data()
+        finally:
+            await close_stream(engine_generator)
 
-        async for resp in engine_generator:
-            yield GeneralResponse.model_validate_json(resp.data())
+    async def _generate_direct(self, raw_request: GeneralRequest):
+        """Send to the worker chosen from measured latency and outstanding requests"""
+        worker_ids = self.worker_client.instance_ids()
+        if self.router == "least-outstanding":
+            worker_id = self.latency.pick_least_outstanding(worker_ids)
+        else:
+            worker_id = self.latency.pick_ewma(worker_ids)
+        if worker_id is None:
+            raise RuntimeError("No workers available")
+
+        self.latency.start(worker_id)
+        start = time.monotonic()
+        first = True
+        engine_generator = None
+        try:
+            engine_generator = await self.worker_client.direct(
+                self.request_codec.encode(raw_request), worker_id
+            )
+            async for resp in engine_generator:
+                if first:
+                    self.latency.first_chunk(worker_id, time.monotonic() - start)
+                    first = False
+                yield resp.data()
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away; that says nothing about the worker's speed
+            self.latency.cancel(worker_id)
+            raise
+        except Exception:
+            if expired(raw_request.deadline):
+                # Dropped for its deadline; not the worker's fault
+                self.latency.cancel(worker_id)
+            else:
+                self.latency.finish(worker_id, time.monotonic() - start, ok=False)
+            raise
+        else:
+            self.latency.finish(worker_id, time.monotonic() - start)
+        finally:
+            if engine_generator is not None:
+                await close_stream(engine_generator)
+
+    def _sample_validate(self, raw_response: str):
+        """Validate a sampled fraction of pass-through responses"""
+        if random.random() >= self.validate_sample_rate:
+            return
+        try:
+            self.response_codec.decode(raw_response)
+        except DECODE_ERRORS as e:
+            logger.warning(f"Invalid response from worker: {e}")
 
     @endpoint()
-    async def generate(self, request: GeneralRequest):
+    async def stats(self, raw_request: str):
+        """Return per-worker latency estimates as JSON"""
+        yield json.dumps(
+            {
+                "router": self.router,
+                "workers": self.latency.stats(),
+                "expired_requests": self.expired_requests,
+            }
+        )
+
+    @endpoint()
+    async def generate(self, raw_request: str):
         """Forward requests to backend."""
-        mid_request = request.model_dump_json()
-        logger.info(f"Received request{mid_request=}")
-        async for response in self._generate(request):
-            logger.debug(f"Received response: {response.model_dump_json()}")
-            yield response.model_dump_json()
+        request = self.request_codec.decode(raw_request)
+        logger.info(f"Received request{request=}")
+        if expired(request.deadline):
+            # The client has given up; do not send it to a worker
+            self.expired_requests += 1
+            raise DeadlineExceeded(
+                f"Request {request.request_id} expired before the Processor"
+            )
+        async with aclosing(self._generate(request)) as responses:
+            async for raw_response in responses:
+                logger.debug(f"Received response: {raw_response}")
+                if self.relay_mode == "passthrough":
+                    # Forward worker output untouched
+                    self._sample_validate(raw_response)
+                    yield raw_response
+                else:
+                    yield self.response_codec.encode(
+                        self.response_codec.decode(raw_response)
+                    )
@@ -13,19 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import logging
+from typing import Optional
 
+import msgspec
 from pydantic import BaseModel
 
-from dynamo._core import Client
-
 logger = logging.getLogger(__name__)
 
 
 class GeneralRequest(BaseModel):
     prompt: str = "user input"
     request_id: str = "id_string"
+    deadline: Optional[
+        float
+    ] = None  # Absolute time.time() after which nobody waits for the result
 
 
 class GeneralResponse(BaseModel):
@@ -33,27 +35,16 @@ class GeneralResponse(BaseModel):
     request_id: str = "id_string"
 
 
-async def check_required_workers(
-    workers_client: Client,
-    required_workers: int,
-    on_change=True,
-    poll_interval=5,
-    tag="",
-):
-    """Wait until the minimum number of workers are ready."""
-    worker_ids = workers_client.instance_ids()
-    num_workers = len(worker_ids)
-    new_count = -1  # Force to log "waiting for worker" once
-    while num_workers < required_workers:
-        if (not on_change) or new_count != num_workers:
-            num_workers = new_count if new_count >= 0 else num_workers
-            logger.info(
-                f" {tag} Waiting for more workers to be ready.\n"
-                f" Current: {num_workers},"
-                f" Required: {required_workers}"
-            )
-        await asyncio.sleep(poll_interval)
-        worker_ids = workers_client.instance_ids()
-        new_count = len(worker_ids)
-
-    return worker_ids
+class GeneralRequestMsg(msgspec.Struct):
+    """msgspec wire form of GeneralRequest"""
+
+    prompt: str = "user input"
+    request_id: str = "id_string"
+    deadline: Optional[float] = None
+
+
+class GeneralResponseMsg(msgspec.Struct):
+    """msgspec wire form of GeneralResponse"""
+
+    worker_output: str = "generated output"
+    request_id: str = "id_string"
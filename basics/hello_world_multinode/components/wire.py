@@ -0,0 +1 @@
+../../common/wire.py
\ No newline at end of file
@@ -16,9 +16,11 @@
 import logging
 import socket
 
-from components.utils import GeneralRequest, GeneralResponse
+from components.codec import graph_codecs
+from components.deadlines import DeadlineExceeded, expired
 
 from dynamo.sdk import DYNAMO_IMAGE, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
 
 logger = logging.getLogger(__name__)
 
@@ -32,11 +34,23 @@ logger = logging.getLogger(__name__)
 class DummyWorker:
     def __init__(self):
         self.hostname = socket.gethostname()
+        config = ServiceConfig.get_instance()
+        self.request_codec, self.response_codec = graph_codecs(config)
 
     @endpoint()
-    async def generate(self, request: GeneralRequest):
+    async def generate(self, raw_request: str):
+        request = self.request_codec.decode(raw_request)
         logger.info(f"{self.hostname}: Worker invoked")
-        yield GeneralResponse(
-            request_id=request.request_id,
-            worker_output=request.prompt + "_GeneratedBy_" + self.hostname,
-        ).model_dump_json()
+        if expired(request.deadline):
+            logger.info(
+                f"{self.hostname}: Dropping expired request {request.request_id}"
+            )
+            raise DeadlineExceeded(
+                f"Request {request.request_id} expired before the worker"
+            )
+        yield self.response_codec.encode(
+            self.response_codec.new(
+                request_id=request.request_id,
+                worker_output=request.prompt + "_GeneratedBy_" + self.hostname,
+            )
+        )
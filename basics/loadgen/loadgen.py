@@ -0,0 +1,348 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load generator for the /generate endpoints of the example graphs.
+
+Replays a JSONL workload (one request body per line) against a running
+Frontend with closed-loop or open-loop (Poisson or bursty) arrivals, and
+reports time to first chunk, inter-chunk latency, end-to-end latency and
+throughput. Uses only the standard library.
+
+    python loadgen.py --target multistage --arrival poisson --rate 20 --duration 60 \\
+        --output results/multistage.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+SCHEMA_VERSION = 1
+WORKLOAD_DIR = Path(__file__).parent / "workloads"
+
+# Default workload file and request id field for each example Frontend
+TARGETS: Dict[str, dict] = {
+    "hello_world": {"workload": "text.jsonl", "request_id_field": None},
+    "simple_pipeline": {"workload": "text.jsonl", "request_id_field": None},
+    "multistage": {"workload": "text.jsonl", "request_id_field": "request_id"},
+    "multinode": {"workload": "prompt.jsonl", "request_id_field": "request_id"},
+}
+
+
+@dataclass
+class RequestResult:
+    """Timing of one streamed request, in seconds relative to its send time"""
+
+    scheduled_at: float
+    status: int = 0
+    ttfc: Optional[float] = None
+    latency: Optional[float] = None
+    chunk_gaps: List[float] = field(default_factory=list)
+    chunks: int = 0
+    bytes: int = 0
+    error: Optional[str] = None
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> tuple[int, Dict[str, str]]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed before response")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]):
+    """Yield body pieces as they arrive; each HTTP chunk counts as one stream chunk"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                return
+            data = await reader.readexactly(size)
+            await reader.readline()
+            yield data
+    elif "content-length" in headers:
+        yield await reader.readexactly(int(headers["content-length"]))
+    else:
+        while data := await reader.read(65536):
+            yield data
+
+
+async def send_request(url: str, body: dict, result: RequestResult, timeout: float):
+    """POST body to url and record streaming timings into result"""
+    parts = urlsplit(url)
+    payload = json.dumps(body).encode()
+    start = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, parts.port or 80), timeout
+        )
+        writer.write(
+            f"POST {parts.path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        result.status, headers = await asyncio.wait_for(_read_headers(reader), timeout)
+        last = None
+        async for data in _iter_body(reader, headers):
+            now = time.perf_counter()
+            if last is None:
+                result.ttfc = now - start
+            else:
+                result.chunk_gaps.append(now - last)
+            last = now
+            result.chunks += 1
+            result.bytes += len(data)
+        result.latency = time.perf_counter() - start
+        if result.status >= 400:
+            result.error = f"HTTP {result.status}"
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def load_workload(path: Path) -> List[dict]:
+    with open(path) as f:
+        bodies = [json.loads(line) for line in f if line.strip()]
+    if not bodies:
+        raise ValueError(f"{path} has no requests")
+    return bodies
+
+
+def make_bodies(workload: List[dict], request_id_field: Optional[str]):
+    """Cycle through the workload, giving each request a unique id when the target takes one"""
+    for body in itertools.cycle(workload):
+        body = dict(body)
+        if request_id_field:
+            body[request_id_field] = f"loadgen-{uuid.uuid4().hex[:12]}"
+        yield body
+
+
+def arrival_gaps(args, rng: random.Random):
+    """Yield (gap_seconds, requests_in_group) for open-loop arrival patterns"""
+    if args.arrival == "poisson":
+        while True:
+            yield rng.expovariate(args.rate), 1
+    else:
+        # Bursts of burst_size requests, bursts arriving as a Poisson process
+        while True:
+            yield rng.expovariate(args.rate / args.burst_size), args.burst_size
+
+
+async def run_open_loop(args, bodies, rng) -> List[RequestResult]:
+    results, tasks = [], []
+    start = time.perf_counter()
+    gaps = arrival_gaps(args, rng)
+    next_at = 0.0
+    while len(results) < args.requests and next_at < args.duration:
+        delay = start + next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        gap, group = next(gaps)
+        for _ in range(min(group, args.requests - len(results))):
+            result = RequestResult(scheduled_at=next_at)
+            results.append(result)
+            tasks.append(
+                asyncio.create_task(
+                    send_request(args.url, next(bodies), result, args.timeout)
+                )
+            )
+        next_at += gap
+    await asyncio.gather(*tasks)
+    return results
+
+
+async def run_closed_loop(args, bodies, rng) -> List[RequestResult]:
+    results = []
+    start = time.perf_counter()
+
+    async def user():
+        while (
+            len(results) < args.requests and time.perf_counter() - start < args.duration
+        ):
+            result = RequestResult(scheduled_at=time.perf_counter() - start)
+            results.append(result)
+            await send_request(args.url, next(bodies), result, args.timeout)
+            if args.think_time > 0:
+                await asyncio.sleep(rng.expovariate(1 / args.think_time))
+
+    await asyncio.gather(*(user() for _ in range(args.concurrency)))
+    return results
+
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "count": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": sum(ordered) / len(ordered),
+        "count": len(ordered),
+    }
+
+
+def summarize(results: List[RequestResult], wall_time: float) -> dict:
+    ok = [r for r in results if r.error is None]
+    return {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "wall_time_s": wall_time,
+        "request_throughput": len(ok) / wall_time if wall_time > 0 else 0.0,
+        "chunk_throughput": sum(r.chunks for r in ok) / wall_time
+        if wall_time > 0
+        else 0.0,
+        "ttfc_s": percentiles([r.ttfc for r in ok if r.ttfc is not None]),
+        "inter_chunk_s": percentiles([gap for r in ok for gap in r.chunk_gaps]),
+        "latency_s": percentiles([r.latency for r in ok if r.latency is not None]),
+        "errors": sorted({r.error for r in results if r.error}),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_summary(summary: dict):
+    ok = f"{summary['succeeded']}/{summary['requests']}"
+    print(f"requests: {ok} ok in {summary['wall_time_s']:.1f}s")
+    print(
+        f"throughput: {summary['request_throughput']:.2f} req/s, "
+        f"{summary['chunk_throughput']:.1f} chunks/s"
+    )
+    print(f"{'metric':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, key in (
+        ("ttfc", "ttfc_s"),
+        ("inter-chunk", "inter_chunk_s"),
+        ("latency", "latency_s"),
+    ):
+        stats = summary[key]
+        if stats["count"]:
+            row = "".join(f"{stats[q] * 1000:>10.1f}" for q in ("p50", "p95", "p99"))
+            print(f"{name:<14}{row}")
+    for error in summary["errors"]:
+        print(f"error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), default="hello_world")
+    parser.add_argument("--url", default="http://localhost:8000/generate")
+    parser.add_argument(
+        "--workload", type=Path, help="JSONL file with one request body per line"
+    )
+    parser.add_argument(
+        "--arrival", choices=["closed", "poisson", "bursty"], default="closed"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Closed loop: concurrent users"
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.0,
+        help="Closed loop: mean pause between requests",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="Open loop: mean requests per second"
+    )
+    parser.add_argument(
+        "--burst-size", type=int, default=10, help="Bursty: requests per burst"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=100, help="Stop after this many requests"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=float("inf"),
+        help="Stop sending after this many seconds",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=Path, help="Write machine-readable results as JSON"
+    )
+    args = parser.parse_args()
+
+    target = TARGETS[args.target]
+    workload = load_workload(args.workload or WORKLOAD_DIR / target["workload"])
+    bodies = make_bodies(workload, target["request_id_field"])
+    rng = random.Random(args.seed)
+
+    run = run_closed_loop if args.arrival == "closed" else run_open_loop
+    start = time.perf_counter()
+    results = asyncio.run(run(args, bodies, rng))
+    summary = summarize(results, time.perf_counter() - start)
+    print_summary(summary)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        config = {
+            k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+        }
+        config["duration"] = None if args.duration == float("inf") else args.duration
+        report = {
+            "schema_version": SCHEMA_VERSION,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": config,
+            "summary": summary,
+            "requests": [asdict(r) for r in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency and shedding under overload with each admission limit.
+
+Requests arrive faster than a simulated pipeline with a fixed number of
+Backend slots can serve them. Without admission control every request is
+accepted and queues downstream; with it the excess is rejected at the
+Frontend. Run from the multistage_pipeline directory:
+
+    python -m benchmarks.admission --rate 1500 --slots 10 --service-ms 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from components.admission import (
+    LIMITS,
+    AdmissionController,
+    AdmissionRejected,
+    make_limit,
+)
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+async def run(args, limit_name) -> dict:
+    rng = random.Random(args.seed)
+    slots = asyncio.Semaphore(args.slots)
+    controller = None
+    if limit_name is not None:
+        controller = AdmissionController(
+            make_limit(
+                limit_name,
+                initial=args.initial_limit,
+                min_limit=1,
+                max_limit=args.max_limit,
+                latency_target=args.latency_target_ms / 1000,
+            ),
+            max_queue=args.max_queue,
+            queue_timeout=args.queue_timeout_ms / 1000,
+        )
+    latencies, rejected = [], 0
+
+    async def client():
+        nonlocal rejected
+        start = time.perf_counter()
+        permit = None
+        if controller is not None:
+            try:
+                permit = await controller.acquire()
+            except AdmissionRejected:
+                rejected += 1
+                return
+        admitted = time.perf_counter()
+        async with slots:
+            await asyncio.sleep(args.service_ms * rng.uniform(0.5, 1.5) / 1000)
+        if permit is not None:
+            permit.release(time.perf_counter() - admitted)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(args.rate * args.duration)):
+        # Open loop: arrivals do not wait for earlier requests
+        target = started + i / args.rate
+        delay = target - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(client()))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "goodput": len(latencies) / elapsed,
+        "rejected": rejected / len(tasks),
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "limit": controller.limit.limit if controller else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1500.0, help="Arrivals per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=3.0, help="Seconds of arrivals"
+    )
+    parser.add_argument(
+        "--slots", type=int, default=10, help="Requests the pipeline serves at once"
+    )
+    parser.add_argument("--service-ms", type=float, default=10.0)
+    parser.add_argument("--initial-limit", type=int, default=32)
+    parser.add_argument("--max-limit", type=int, default=256)
+    parser.add_argument("--latency-target-ms", type=float, default=30.0)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--queue-timeout-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    capacity = args.slots * 1000 / args.service_ms
+    print(f"offered {args.rate:.0f} req/s, capacity about {capacity:.0f} req/s")
+    print(
+        f"{'limit':<10} {'goodput':>10} {'rejected':>9} {'p50':>9} {'p99':>9}"
+        f" {'final limit':>12}"
+    )
+    for name in [None, *LIMITS]:
+        result = asyncio.run(run(args, name))
+        final = f"{result['limit']:.1f}" if result["limit"] is not None else "-"
+        print(
+            f"{name or 'none':<10} {result['goodput']:>8.0f}/s {result['rejected']:>9.1%} "
+            f"{result['p50']:>7.1f}ms {result['p99']:>7.1f}ms {final:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
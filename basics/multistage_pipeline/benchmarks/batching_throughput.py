@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Throughput of the Backend step batching scheduler versus batch size.
+
+Each step pays a fixed CPU cost (like reading model weights once per
+forward pass) plus a small cost per item, so larger batches amortize the
+fixed part. Run from the multistage_pipeline directory:
+
+    python -m benchmarks.batching_throughput --batch-sizes 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import hashlib
+import time
+
+from components.scheduler import StepBatchScheduler
+
+
+def make_step_fn(step_rounds: int, item_rounds: int):
+    def step_fn(items):
+        digest = b"step"
+        for _ in range(step_rounds):
+            digest = hashlib.sha256(digest).digest()
+        outputs = []
+        for greeting, word in items:
+            item_digest = word.encode()
+            for _ in range(item_rounds):
+                item_digest = hashlib.sha256(item_digest).digest()
+            outputs.append(f"{greeting} {word}!")
+        return outputs
+
+    return step_fn
+
+
+async def run(batch_size: int, args) -> dict:
+    scheduler = StepBatchScheduler(
+        make_step_fn(args.step_rounds, args.item_rounds),
+        max_batch_size=batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    words = [("Hello", f"word{i}") for i in range(args.words)]
+    first_chunk = []
+
+    async def one_request():
+        start = time.perf_counter()
+        count = 0
+        async for _ in scheduler.submit(words):
+            if count == 0:
+                first_chunk.append(time.perf_counter() - start)
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    produced = await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    first_chunk.sort()
+    return {
+        "words_per_sec": sum(produced) / elapsed,
+        "steps": scheduler.steps,
+        "p50_first_chunk_ms": first_chunk[len(first_chunk) // 2] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--words", type=int, default=32)
+    parser.add_argument("--step-rounds", type=int, default=2000)
+    parser.add_argument("--item-rounds", type=int, default=50)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'batch':>6}{'words/s':>12}{'steps':>8}{'p50 first chunk ms':>20}")
+    for batch_size in args.batch_sizes:
+        result = asyncio.run(run(batch_size, args))
+        print(
+            f"{batch_size:>6}{result['words_per_sec']:>12,.0f}{result['steps']:>8}"
+            f"{result['p50_first_chunk_ms']:>20.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
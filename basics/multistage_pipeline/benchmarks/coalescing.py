@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Backend load and latency with and without Frontend request coalescing.
+
+Clients arrive in bursts where most requests repeat a few popular texts.
+The pipeline is simulated with a fixed time per chunk and a limited number
+of Backend slots. Run from the multistage_pipeline directory:
+
+    python -m benchmarks.coalescing --bursts 20 --burst-size 50 --distinct 5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from components.coalescing import SingleFlight
+
+
+class SimulatedPipeline:
+    """Streams chunk_count chunks per request through a limited number of Backend slots"""
+
+    def __init__(self, slots: int, chunk_count: int, chunk_time: float):
+        self.slots = asyncio.Semaphore(slots)
+        self.chunk_count = chunk_count
+        self.chunk_time = chunk_time
+        self.calls = 0
+
+    async def process(self, text: str):
+        self.calls += 1
+        async with self.slots:
+            for i in range(self.chunk_count):
+                await asyncio.sleep(self.chunk_time)
+                yield f"{text}:{i}"
+
+
+async def run(args, coalesce: bool) -> dict:
+    rng = random.Random(args.seed)
+    pipeline = SimulatedPipeline(args.slots, args.chunks, args.chunk_ms / 1000)
+    coalescer = SingleFlight(max_replay=args.chunks) if coalesce else None
+    ttfcs, latencies = [], []
+
+    async def client(text: str):
+        start = time.perf_counter()
+        if coalescer is None:
+            stream = pipeline.process(text)
+        else:
+            stream, _ = coalescer.subscribe(text, lambda: pipeline.process(text))
+        first = None
+        async for _ in stream:
+            if first is None:
+                first = time.perf_counter() - start
+        ttfcs.append(first)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tasks = []
+    for _ in range(args.bursts):
+        for _ in range(args.burst_size):
+            text = f"text-{rng.randrange(args.distinct)}"
+            tasks.append(asyncio.create_task(client(text)))
+            await asyncio.sleep(
+                rng.expovariate(args.burst_size / (args.burst_ms / 1000))
+            )
+        await asyncio.sleep(args.gap_ms / 1000)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    ttfcs.sort()
+    latencies.sort()
+    return {
+        "mode": "coalesce" if coalesce else "direct",
+        "backend_calls": pipeline.calls,
+        "p50_ttfc_ms": ttfcs[len(ttfcs) // 2] * 1000,
+        "p99_ttfc_ms": ttfcs[int(len(ttfcs) * 0.99)] * 1000,
+        "p99_latency_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "req_per_s": len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument(
+        "--burst-ms", type=float, default=20, help="Time over which a burst arrives"
+    )
+    parser.add_argument("--gap-ms", type=float, default=50, help="Pause between bursts")
+    parser.add_argument(
+        "--distinct", type=int, default=5, help="Distinct texts in the workload"
+    )
+    parser.add_argument(
+        "--slots", type=int, default=8, help="Concurrent Backend streams"
+    )
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--chunk-ms", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<10}{'backend calls':>15}{'p50 ttfc ms':>13}{'p99 ttfc ms':>13}"
+        f"{'p99 lat ms':>12}{'req/s':>10}"
+    )
+    for coalesce in (False, True):
+        r = asyncio.run(run(args, coalesce))
+        print(
+            f"{r['mode']:<10}{r['backend_calls']:>15}{r['p50_ttfc_ms']:>13.1f}"
+            f"{r['p99_ttfc_ms']:>13.1f}{r['p99_latency_ms']:>12.1f}{r['req_per_s']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
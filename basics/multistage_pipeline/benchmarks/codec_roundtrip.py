@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encode/decode round trip cost of the pipeline wire codecs.
+
+Run from the multistage_pipeline directory:
+
+    python -m benchmarks.codec_roundtrip --words 1 10 100 1000
+"""
+
+import argparse
+import time
+
+from components.codec import CODECS, make_codecs
+
+
+def roundtrip_rate(codec, message, iterations: int) -> float:
+    encode, decode = codec.encode, codec.decode
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(encode(message))
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--codecs", nargs="+", default=list(CODECS))
+    args = parser.parse_args()
+
+    print(
+        f"{'codec':<14}{'words':>7}{'message':>10}{'bytes':>9}"
+        f"{'round trips/s':>16}{'vs pydantic':>13}"
+    )
+    for words in args.words:
+        text = ",".join(f"word{i}" for i in range(words))
+        baseline = {}
+        for name in args.codecs:
+            request_codec, response_codec = make_codecs(name)
+            messages = {
+                "request": (
+                    request_codec,
+                    request_codec.new(
+                        text=text, request_id="bench-1", greeting="Hello"
+                    ),
+                ),
+                "response": (
+                    response_codec,
+                    response_codec.new(
+                        processed_text=f"Hello {text}!",
+                        request_id="bench-1",
+                        worker_id="host_1234",
+                    ),
+                ),
+            }
+            for kind, (codec, message) in messages.items():
+                rate = roundtrip_rate(
+                    codec, message, max(args.iterations // max(words // 10, 1), 100)
+                )
+                baseline.setdefault(kind, rate)
+                encoded = codec.encode(message)
+                # The "local" codec hands over the object itself: nothing goes on the wire
+                size = len(encoded) if isinstance(encoded, (str, bytes)) else "-"
+                print(
+                    f"{name:<14}{words:>7}{kind:>10}{size:>9}{rate:>16,.0f}"
+                    f"{rate / baseline[kind]:>12.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Interactive latency next to long batch texts under fifo and fair scheduling.
+
+Short interactive texts arrive at a steady rate while clients keep long
+batch texts in flight, all on one Backend batching scheduler. Run from the
+multistage_pipeline directory:
+
+    python -m benchmarks.fair_scheduling --interactive-words 3 --batch-words 60 --batch-size 8
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from contextlib import aclosing
+
+from components.fair_queue import ClassLatency, WeightedFairQueue
+from components.scheduler import StepBatchScheduler
+
+
+def step_fn(items):
+    return [f"{greeting} {word}!" for greeting, word in items]
+
+
+async def run(args, fair: bool) -> dict:
+    rng = random.Random(args.seed)
+    queue = (
+        WeightedFairQueue({"interactive": args.interactive_weight, "batch": 1})
+        if fair
+        else None
+    )
+    scheduler = StepBatchScheduler(
+        step_fn,
+        step_time=args.step_ms / 1000,
+        max_batch_size=args.batch_size,
+        max_wait_ms=0,
+        fair_queue=queue,
+    )
+    latency = ClassLatency(window=100000)
+    stop = asyncio.Event()
+
+    async def request(priority: str, words: int, tenant: str):
+        items = [("Hello", f"w{i}") for i in range(words)]
+        start = time.perf_counter()
+        first = None
+        async with aclosing(scheduler.submit(items, (priority, tenant))) as outputs:
+            async for _ in outputs:
+                if first is None:
+                    first = time.perf_counter() - start
+        latency.record(priority, first, time.perf_counter() - start)
+
+    async def batch_client(index: int):
+        while not stop.is_set():
+            await request("batch", args.batch_words, f"tenant{index % 2}")
+
+    async def interactive_arrivals():
+        tasks = []
+        for _ in range(args.interactive_requests):
+            await asyncio.sleep(rng.expovariate(args.interactive_rate))
+            tasks.append(
+                asyncio.create_task(
+                    request("interactive", args.interactive_words, "web")
+                )
+            )
+        await asyncio.gather(*tasks)
+        stop.set()
+
+    started = time.perf_counter()
+    batch_tasks = [
+        asyncio.create_task(batch_client(i)) for i in range(args.batch_clients)
+    ]
+    await interactive_arrivals()
+    await asyncio.gather(*batch_tasks)
+    stats = latency.stats()
+    stats["words_per_second"] = scheduler.items_processed / (
+        time.perf_counter() - started
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--interactive-words", type=int, default=3)
+    parser.add_argument(
+        "--interactive-rate",
+        type=float,
+        default=50.0,
+        help="Interactive arrivals per second",
+    )
+    parser.add_argument("--interactive-requests", type=int, default=300)
+    parser.add_argument("--interactive-weight", type=float, default=8.0)
+    parser.add_argument("--batch-words", type=int, default=60)
+    parser.add_argument(
+        "--batch-clients", type=int, default=16, help="Batch texts kept in flight"
+    )
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--step-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'scheduling':<11} {'class':<12} {'requests':>8} {'ttfc p50':>10}"
+        f" {'ttfc p99':>10} {'latency p99':>12} {'words/s':>9}"
+    )
+    for fair in (False, True):
+        stats = asyncio.run(run(args, fair))
+        for priority in ("interactive", "batch"):
+            row = stats[priority]
+            print(
+                f"{'fair' if fair else 'fifo':<11} {priority:<12} {row['requests']:>8} "
+                f"{row['ttfc_p50'] * 1000:>8.1f}ms {row['ttfc_p99'] * 1000:>8.1f}ms "
+                f"{row['latency_p99'] * 1000:>10.1f}ms {stats['words_per_second']:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
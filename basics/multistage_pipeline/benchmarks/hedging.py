@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tail latency and extra Backend load with and without hedged requests.
+
+Each simulated worker occasionally stalls before its first chunk, as a
+GC pause or a noisy neighbour would. Run from the multistage_pipeline
+directory:
+
+    python -m benchmarks.hedging --requests 2000 --stall-rate 0.02 --budget 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from components.hedging import Hedger
+
+
+class SimulatedWorkers:
+    """Workers that answer after first_ms, or after stall_ms with probability stall_rate"""
+
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.calls = 0
+
+    async def stream(self):
+        self.calls += 1
+        first = self.args.first_ms
+        if self.rng.random() < self.args.stall_rate:
+            first = self.args.stall_ms
+        await asyncio.sleep(first * self.rng.uniform(0.8, 1.2) / 1000)
+        for i in range(self.args.chunks):
+            if i:
+                await asyncio.sleep(self.args.chunk_ms / 1000)
+            yield i
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+async def run(args, hedge: bool) -> dict:
+    workers = SimulatedWorkers(args, random.Random(args.seed))
+    hedger = Hedger(
+        percentile=args.percentile,
+        min_delay=args.min_delay_ms / 1000,
+        budget=args.budget,
+    )
+    ttfcs = []
+
+    async def backup():
+        return workers.stream()
+
+    async def client():
+        start = time.perf_counter()
+        stream = hedger.stream(workers.stream(), backup) if hedge else workers.stream()
+        first = None
+        async for _ in stream:
+            if first is None:
+                first = time.perf_counter() - start
+        ttfcs.append(first * 1000)
+
+    for start in range(0, args.requests, args.concurrency):
+        await asyncio.gather(
+            *(client() for _ in range(min(args.concurrency, args.requests - start)))
+        )
+
+    return {
+        "p50": statistics.median(ttfcs),
+        "p99": percentile(ttfcs, 99),
+        "max": max(ttfcs),
+        "extra_load": workers.calls / args.requests - 1,
+        "hedges": hedger.issued if hedge else 0,
+        "won": hedger.won if hedge else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=3)
+    parser.add_argument("--first-ms", type=float, default=5.0)
+    parser.add_argument("--chunk-ms", type=float, default=1.0)
+    parser.add_argument("--stall-rate", type=float, default=0.02)
+    parser.add_argument("--stall-ms", type=float, default=200.0)
+    parser.add_argument("--percentile", type=float, default=95.0)
+    parser.add_argument("--min-delay-ms", type=float, default=1.0)
+    parser.add_argument("--budget", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<10} {'ttfc p50':>10} {'ttfc p99':>10} {'ttfc max':>10}"
+        f" {'extra load':>11} {'hedges':>7} {'won':>5}"
+    )
+    for hedge in (False, True):
+        result = asyncio.run(run(args, hedge))
+        print(
+            f"{'hedged' if hedge else 'single':<10} {result['p50']:>8.1f}ms"
+            f" {result['p99']:>8.1f}ms {result['max']:>8.1f}ms"
+            f" {result['extra_load']:>10.1%} {result['hedges']:>7} {result['won']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Inline versus thread-pool versus process-pool execution of Backend work.
+
+Streams run concurrently and each word calls a CPU-bound processing
+function through ComputeOffload. Besides throughput, the benchmark
+reports the worst event loop stall seen by a ticker task, which is what
+other streams on the same worker experience. Run from the
+multistage_pipeline directory:
+
+    python -m benchmarks.offload_scaling --pool-sizes 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+
+from components.offload import ComputeOffload
+
+
+def cpu_heavy_word(greeting: str, word: str, rounds: int) -> str:
+    digest = word.encode()
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return f"{greeting} {word}!"
+
+
+async def ticker(interval: float, stalls: list):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def run(mode: str, pool_size: int, args) -> dict:
+    offload = ComputeOffload(mode, pool_size)
+    stalls = []
+    tick = asyncio.create_task(ticker(0.001, stalls))
+
+    async def stream(index: int):
+        for i in range(args.words):
+            await offload.run(cpu_heavy_word, "Hello", f"w{index}_{i}", args.rounds)
+            # Hand the chunk to the transport, as process_text does
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(stream(i) for i in range(args.streams)))
+    elapsed = time.perf_counter() - start
+    tick.cancel()
+    offload.shutdown(wait=True)
+    return {
+        "words_per_sec": args.streams * args.words / elapsed,
+        "max_stall_ms": max(stalls, default=0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--pool-sizes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--streams", type=int, default=16)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'executor':<10}{'pool':>6}{'words/s':>12}{'max loop stall ms':>20}")
+    result = asyncio.run(run("inline", 0, args))
+    print(
+        f"{'inline':<10}{'-':>6}{result['words_per_sec']:>12,.1f}{result['max_stall_ms']:>20.1f}"
+    )
+    for mode in ("thread", "process"):
+        for pool_size in args.pool_sizes:
+            result = asyncio.run(run(mode, pool_size, args))
+            print(
+                f"{mode:<10}{pool_size:>6}{result['words_per_sec']:>12,.1f}"
+                f"{result['max_stall_ms']:>20.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache locality, load balance and rebalancing of Router selection policies.
+
+Requests draw their text prefix from a Zipf-like distribution and each
+worker keeps an LRU cache of prefixes it has served. Reports the prefix
+cache hit ratio, the worst worker load relative to the mean, and the share
+of prefixes that move to another worker when one worker leaves (ideally
+1/workers). Run from
+the multistage_pipeline directory:
+
+    python -m benchmarks.prefix_affinity --workers 8 --prefixes 2000
+"""
+
+import argparse
+import random
+from collections import OrderedDict, deque
+
+from components.routing import SELECTION_POLICIES, WorkerLoadTracker, make_policy
+
+
+def zipf_sampler(rng: random.Random, count: int, skew: float):
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    population = list(range(count))
+    return lambda: rng.choices(population, weights)[0]
+
+
+def run_policy(name: str, args) -> dict:
+    rng = random.Random(args.seed)
+    options = {"prefix_chars": 16, "load_factor": args.load_factor}
+    tracker = WorkerLoadTracker(policy=make_policy(name, **options))
+    for worker_id in range(args.workers):
+        tracker.add_worker(worker_id)
+    caches = {worker_id: OrderedDict() for worker_id in range(args.workers)}
+    sample = zipf_sampler(rng, args.prefixes, args.skew)
+
+    hits = 0
+    worst_ratio = 0.0
+    inflight = deque()
+    for i in range(args.requests):
+        text = f"prefix-{sample():08d} request {i}"
+        prefix = text[:16]
+        worker_id = tracker.select(text)
+        tracker.acquire(str(i), worker_id, 10)
+        inflight.append(str(i))
+        if len(inflight) > args.workers * args.inflight_per_worker:
+            tracker.release(inflight.popleft())
+
+        cache = caches[worker_id]
+        if prefix in cache:
+            hits += 1
+            cache.move_to_end(prefix)
+        else:
+            cache[prefix] = True
+            if len(cache) > args.cache_size:
+                cache.popitem(last=False)
+
+        if i >= args.warmup:
+            loads = tracker.loads().values()
+            worst_ratio = max(worst_ratio, max(loads) / (sum(loads) / len(loads)))
+
+    result = {
+        "hit_ratio": hits / args.requests,
+        "worst_load_ratio": worst_ratio,
+        "moved_on_leave": None,
+    }
+    if not tracker.policy.uses_key:
+        return result
+
+    # Rebalancing: where do prefixes go on an idle cluster before and after a worker leaves
+    idle = make_policy(name, **options)
+    for worker_id in range(args.workers):
+        idle.update(worker_id, 0.0)
+    keys = [f"prefix-{p:08d} x" for p in range(args.prefixes)]
+    before = {key: idle.select(key) for key in keys}
+    idle.remove(args.workers - 1)
+    after = {key: idle.select(key) for key in keys}
+    result["moved_on_leave"] = sum(
+        1 for key in keys if before[key] != after[key]
+    ) / len(keys)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--prefixes", type=int, default=2000)
+    parser.add_argument(
+        "--skew", type=float, default=1.0, help="Zipf exponent of prefix popularity"
+    )
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1000,
+        help="Requests before load balance is measured",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=100, help="Prefixes each worker keeps cached"
+    )
+    parser.add_argument("--inflight-per-worker", type=int, default=4)
+    parser.add_argument("--load-factor", type=float, default=1.25)
+    parser.add_argument("--policies", nargs="+", default=list(SELECTION_POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'policy':<16}{'hit ratio':>11}{'max/mean load':>15}{'moved on leave':>16}")
+    for name in args.policies:
+        r = run_policy(name, args)
+        moved = "-" if r["moved_on_leave"] is None else f"{r['moved_on_leave']:.3f}"
+        print(
+            f"{name:<16}{r['hit_ratio']:>11.3f}{r['worst_load_ratio']:>15.2f}{moved:>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Throughput and latency of the task queue backends.
+
+The inprocess and shm backends need no services. Pass --nats-server to
+include NATS (requires the Dynamo runtime and a running server). Run from
+the multistage_pipeline directory:
+
+    python -m benchmarks.queue_backends --tasks 20000 --size 256
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import tempfile
+import time
+
+from components.queues import make_queue
+
+TIMESTAMP = struct.Struct("<d")
+
+
+async def bench_backend(backend: str, args) -> dict:
+    shm_path = os.path.join(tempfile.gettempdir(), f"bench_{os.getpid()}.ring")
+    queue = make_queue(
+        backend,
+        f"bench_{backend}_{os.getpid()}",
+        dequeue_timeout=0.1,
+        nats_server=args.nats_server or "",
+        shm_path=shm_path,
+        shm_capacity=max(args.tasks * (args.size + 8) * 2, 1 << 20),
+    )
+    await queue.connect()
+    payload = b"x" * args.size
+    try:
+        # Throughput: enqueue everything, then drain
+        start = time.perf_counter()
+        for _ in range(args.tasks):
+            await queue.enqueue_task(payload)
+        enqueue_rate = args.tasks / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(args.tasks):
+            await queue.dequeue_task()
+        dequeue_rate = args.tasks / (time.perf_counter() - start)
+
+        # Latency: a producer and consumer running concurrently
+        latencies = []
+
+        async def consume():
+            while len(latencies) < args.latency_tasks:
+                data = await queue.dequeue_task()
+                if data:
+                    latencies.append(
+                        time.perf_counter() - TIMESTAMP.unpack_from(data)[0]
+                    )
+
+        consumer = asyncio.create_task(consume())
+        for _ in range(args.latency_tasks):
+            await queue.enqueue_task(TIMESTAMP.pack(time.perf_counter()) + payload)
+            await asyncio.sleep(0)
+        await consumer
+    finally:
+        await queue.close()
+        if os.path.exists(shm_path):
+            os.remove(shm_path)
+
+    latencies.sort()
+    return {
+        "enqueue_rate": enqueue_rate,
+        "dequeue_rate": dequeue_rate,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--latency-tasks", type=int, default=2_000)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--nats-server", default=None)
+    args = parser.parse_args()
+
+    backends = ["inprocess", "shm"] + (["nats"] if args.nats_server else [])
+    print(
+        f"{'backend':<11}{'enqueue/s':>12}{'dequeue/s':>12}{'p50 ms':>9}{'p99 ms':>9}"
+    )
+    for backend in backends:
+        result = asyncio.run(bench_backend(backend, args))
+        print(
+            f"{backend:<11}{result['enqueue_rate']:>12,.0f}{result['dequeue_rate']:>12,.0f}"
+            f"{result['p50_ms']:>9.3f}{result['p99_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-benchmark for Router worker selection policies.
+
+Run from the multistage_pipeline directory:
+
+    python -m benchmarks.router_selection --workers 10 100 1000
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+
+from components.routing import SELECTION_POLICIES, WorkerLoadTracker
+
+
+def run_policy(name: str, num_workers: int, decisions: int, seed: int) -> dict:
+    """Drive the tracker with a steady stream of acquire/release pairs"""
+    rng = random.Random(seed)
+    tracker = WorkerLoadTracker(policy=SELECTION_POLICIES[name]())
+    for worker_id in range(num_workers):
+        tracker.add_worker(worker_id)
+
+    inflight = deque()
+    target_inflight = num_workers * 4
+    start = time.perf_counter()
+    for i in range(decisions):
+        worker_id = tracker.select()
+        lease_id = str(i)
+        tracker.acquire(lease_id, worker_id, rng.randint(1, 20))
+        inflight.append(lease_id)
+        if len(inflight) > target_inflight:
+            tracker.release(inflight.popleft())
+    elapsed = time.perf_counter() - start
+
+    loads = tracker.loads().values()
+    # Decisions made from one frozen load view, as in a burst before updates land
+    burst = {tracker.select() for _ in range(min(num_workers, 64))}
+    return {
+        "decisions_per_sec": decisions / elapsed,
+        "load_spread": max(loads) - min(loads),
+        "burst_distinct": len(burst),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--decisions", type=int, default=200_000)
+    parser.add_argument("--policies", nargs="+", default=list(SELECTION_POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'policy':<14}{'workers':>8}{'decisions/s':>14}{'load spread':>13}{'burst picks':>13}"
+    )
+    for num_workers in args.workers:
+        for name in args.policies:
+            result = run_policy(name, num_workers, args.decisions, args.seed)
+            print(
+                f"{name:<14}{num_workers:>8}{result['decisions_per_sec']:>14,.0f}"
+                f"{result['load_spread']:>13.1f}{result['burst_distinct']:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
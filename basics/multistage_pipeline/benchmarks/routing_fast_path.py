@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""First-chunk latency of Router RPC routing versus the Middle-local routing table.
+
+Network hops are simulated with a fixed delay so the benchmark runs
+without a Dynamo deployment. Run from the multistage_pipeline directory:
+
+    python -m benchmarks.routing_fast_path --hop-ms 0.5 --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from components.routing import LocalRoutingTable, PowerOfTwoPolicy, WorkerLoadTracker
+from components.utils import RouteRequest, split_words
+
+
+class SimulatedRouter:
+    """Router state plus an RPC endpoint that costs one network hop"""
+
+    def __init__(self, num_workers: int, hop_delay: float):
+        self.hop_delay = hop_delay
+        self.tracker = WorkerLoadTracker()
+        for worker_id in range(num_workers):
+            self.tracker.add_worker(worker_id)
+
+    async def get_best_worker(self, raw_request: str):
+        await asyncio.sleep(self.hop_delay)
+        request = RouteRequest.model_validate_json(raw_request)
+        worker_id = self.tracker.select()
+        self.tracker.acquire(
+            request.lease_id, worker_id, len(split_words(request.text))
+        )
+        yield f"{worker_id}:{self.tracker.load(worker_id)}"
+
+
+async def first_chunk(hop_delay: float):
+    """Connecting to a Backend and receiving its first chunk costs one hop"""
+    await asyncio.sleep(hop_delay)
+
+
+async def rpc_request(router: SimulatedRouter, text: str) -> float:
+    start = time.perf_counter()
+    lease_id = uuid.uuid4().hex
+    route_request = RouteRequest(text=text, lease_id=lease_id)
+    async for route_response in router.get_best_worker(route_request.model_dump_json()):
+        worker_id, _ = route_response.split(":")
+        break
+    await first_chunk(router.hop_delay)
+    elapsed = time.perf_counter() - start
+    router.tracker.release(lease_id)
+    return elapsed
+
+
+async def local_request(
+    router: SimulatedRouter, table: LocalRoutingTable, text: str
+) -> float:
+    start = time.perf_counter()
+    lease_id = uuid.uuid4().hex
+    if table.is_fresh():
+        worker_id = table.select()
+    else:
+        async for route_response in router.get_best_worker(
+            RouteRequest(text=text, lease_id=lease_id).model_dump_json()
+        ):
+            worker_id, _ = route_response.split(":")
+            break
+    await first_chunk(router.hop_delay)
+    elapsed = time.perf_counter() - start
+    router.tracker.release(lease_id)
+    return elapsed
+
+
+async def sync_table(
+    router: SimulatedRouter, table: LocalRoutingTable, interval: float
+):
+    version = 0
+    while True:
+        table.apply(version, router.tracker.loads(), [], full=True)
+        version += 1
+        await asyncio.sleep(interval)
+
+
+async def run(path: str, args) -> list:
+    router = SimulatedRouter(args.workers, args.hop_ms / 1000)
+    table = LocalRoutingTable(
+        max_staleness=args.max_staleness_ms / 1000, policy=PowerOfTwoPolicy(seed=0)
+    )
+    syncer = asyncio.create_task(sync_table(router, table, args.snapshot_ms / 1000))
+    await asyncio.sleep(0)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    text = "sun,moon,stars"
+
+    async def one():
+        async with semaphore:
+            if path == "rpc":
+                return await rpc_request(router, text)
+            return await local_request(router, table, text)
+
+    latencies = await asyncio.gather(*(one() for _ in range(args.requests)))
+    syncer.cancel()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--hop-ms", type=float, default=0.5)
+    parser.add_argument("--snapshot-ms", type=float, default=50)
+    parser.add_argument("--max-staleness-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    print(f"{'path':<8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for path in ("rpc", "local"):
+        latencies = sorted(asyncio.run(run(path, args)))
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(
+            f"{path:<8}{p50:>10.3f}{p99:>10.3f}{statistics.mean(latencies) * 1000:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
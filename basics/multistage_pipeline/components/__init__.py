@@ -12,3 +12,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+
+import os
+
+# Time the imports of every component when startup profiling is enabled
+if os.environ.get("DYNAMO_STARTUP_PROFILE", "").lower() in ("1", "true", "yes"):
+    from components.profiling import install
+
+    install()
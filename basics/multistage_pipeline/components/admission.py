@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted.
+
+    ``status`` is 429 when the wait queue is full and 503 when the request
+    waited until its deadline; ``retry_after`` is a hint in whole seconds.
+    """
+
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimit:
+    """Fixed concurrency limit; base class of the adaptive limits.
+
+    ``update`` is called with the latency of every finished request, or
+    ``dropped=True`` when it failed, along with the number of requests in
+    flight when it started.
+    """
+
+    def __init__(
+        self, initial: int = 32, min_limit: int = 1, max_limit: int = 1024, **options
+    ):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+
+    def update(self, latency: float, inflight: int, dropped: bool = False):
+        pass
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min_limit), self.max_limit)
+
+    def stats(self) -> dict:
+        return {}
+
+
+class AIMDLimit(ConcurrencyLimit):
+    """Additive increase, multiplicative decrease on a latency target.
+
+    The limit grows by about one per limit's worth of fast requests and is
+    multiplied by ``backoff`` whenever a request is slower than
+    ``latency_target`` or fails.
+    """
+
+    def __init__(self, latency_target: float = 0.5, backoff: float = 0.9, **options):
+        super().__init__(**options)
+        self.latency_target = latency_target
+        self.backoff = backoff
+
+    def update(self, latency: float, inflight: int, dropped: bool = False):
+        if dropped or latency > self.latency_target:
+            self.limit = self._clamp(self.limit * self.backoff)
+        elif inflight * 2 >= self.limit:
+            # Only grow while the limit is actually being used
+            self.limit = self._clamp(self.limit + 1 / self.limit)
+
+
+class GradientLimit(ConcurrencyLimit):
+    """Follows the ratio of long-term to recent latency, in the style of Netflix's gradient2.
+
+    While recent latency matches the long-term average the limit keeps
+    growing by its square root, which leaves room to discover more
+    capacity. As queueing pushes recent latency above ``tolerance`` times
+    the long-term average, the limit shrinks in proportion, by at most
+    half per update.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        long_window: int = 600,
+        **options,
+    ):
+        super().__init__(**options)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.long_decay = 2 / (long_window + 1)
+        self.long_latency: Optional[float] = None
+        self.short_latency: Optional[float] = None
+
+    # Floor for latency samples: a coarse clock or a cached answer can report 0.0
+    MIN_LATENCY = 1e-6
+
+    def update(self, latency: float, inflight: int, dropped: bool = False):
+        latency = max(latency, self.MIN_LATENCY)
+        if self.long_latency is None:
+            self.long_latency = self.short_latency = latency
+            return
+        self.short_latency += 0.5 * (latency - self.short_latency)
+        self.long_latency += self.long_decay * (latency - self.long_latency)
+        if self.long_latency > 2 * self.short_latency:
+            # Latency dropped for good; let the baseline follow faster
+            self.long_latency *= 0.95
+        if not dropped and inflight * 2 < self.limit:
+            return
+        gradient = (
+            0.5
+            if dropped
+            else max(
+                0.5, min(1.0, self.tolerance * self.long_latency / self.short_latency)
+            )
+        )
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = self._clamp(
+            self.limit * (1 - self.smoothing) + target * self.smoothing
+        )
+
+    def stats(self) -> dict:
+        return {"long_latency": self.long_latency, "short_latency": self.short_latency}
+
+
+LIMITS = {
+    "fixed": ConcurrencyLimit,
+    "aimd": AIMDLimit,
+    "gradient": GradientLimit,
+}
+
+
+def make_limit(name: str, **options) -> ConcurrencyLimit:
+    """Create a concurrency limit by its config name"""
+    if name not in LIMITS:
+        logger.warning(f"Unknown admission limit '{name}', defaulting to 'gradient'")
+        name = "gradient"
+    return LIMITS[name](**options)
+
+
+class Permit:
+    """An admitted request's slot; give it back with ``release``"""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.started = time.monotonic()
+        self.inflight = controller.inflight
+        self.released = False
+
+    def release(self, latency: Optional[float] = None, dropped: bool = False):
+        """Free the slot, feeding ``latency`` (or the time since admission) to the limit"""
+        if self.released:
+            return
+        self.released = True
+        if latency is None:
+            latency = time.monotonic() - self.started
+        self.controller._release(latency, self.inflight, dropped)
+
+    def cancel(self):
+        """Free the slot without feeding a latency sample to the limit"""
+        if not self.released:
+            self.released = True
+            self.controller._release(None, self.inflight, False)
+
+
+class AdmissionController:
+    """Concurrency limit in front of the pipeline with a bounded FIFO wait queue.
+
+    Up to ``limit`` requests run at once. Others wait in a queue of at most
+    ``max_queue`` entries until a slot frees up or ``queue_timeout`` has
+    passed. Requests that find the queue full or reach their deadline are
+    rejected right away, so overload shows up as fast errors instead of
+    growing latency for everyone.
+    """
+
+    def __init__(
+        self, limit: ConcurrencyLimit, max_queue: int = 64, queue_timeout: float = 1.0
+    ):
+        self.limit = limit
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.recent_latency = 0.0
+
+    def _has_room(self) -> bool:
+        return self.inflight < int(self.limit.limit)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained, at least one"""
+        limit = max(int(self.limit.limit), 1)
+        return max(1, math.ceil((len(self.waiters) + 1) * self.recent_latency / limit))
+
+    async def acquire(self, timeout: Optional[float] = None) -> Permit:
+        """Admit a request, waiting up to ``timeout`` (or ``queue_timeout``) for a slot"""
+        if self._has_room() and not self.waiters:
+            return self._admit()
+        if len(self.waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, "admission queue full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queued += 1
+        try:
+            return await asyncio.wait_for(
+                waiter, self.queue_timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            self.rejected_deadline += 1
+            raise AdmissionRejected(
+                503, "admission deadline exceeded", self.retry_after()
+            )
+        except asyncio.CancelledError:
+            # The client went away just as a slot was handed over
+            if waiter.done() and not waiter.cancelled():
+                waiter.result().cancel()
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    def _admit(self) -> Permit:
+        self.inflight += 1
+        self.admitted += 1
+        return Permit(self)
+
+    def _release(self, latency: Optional[float], inflight: int, dropped: bool):
+        self.inflight -= 1
+        if latency is not None:
+            self.recent_latency += 0.1 * (latency - self.recent_latency)
+            self.limit.update(latency, inflight, dropped)
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self._has_room():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(self._admit())
+
+    def stats(self) -> dict:
+        total = self.admitted + self.rejected_queue_full + self.rejected_deadline
+        rejected = self.rejected_queue_full + self.rejected_deadline
+        return {
+            "limit": round(self.limit.limit, 2),
+            "inflight": self.inflight,
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline,
+            "rejection_rate": rejected / total if total else 0.0,
+            **self.limit.stats(),
+        }
@@ -13,19 +13,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import logging
-import time
 import os
 import socket
-import asyncio
-import msgspec
+import time
+from contextlib import aclosing
 from typing import Optional
 
-from dynamo.sdk import endpoint, service, async_on_start, async_on_shutdown
-from dynamo.sdk.lib.config import ServiceConfig
-from dynamo._core import NatsQueue
+import msgspec
+from components.codec import graph_codecs
+from components.deadlines import DeadlineExceeded, expired
+from components.fair_queue import DEFAULT_CLASS, ClassLatency, WeightedFairQueue
+from components.offload import ComputeOffload, load_function
+from components.profiling import first_request, startup_complete, timed_init
+from components.queues import BackgroundEnqueuer, QueueConsumer, TaskQueue, make_queue
+from components.readiness import timeline
+from components.scheduler import StepBatchScheduler
+from components.utils import QueueTask, TextRequest, split_words
 
-from components.utils import TextRequest, TextResponse, QueueTask
+from dynamo.sdk import async_on_shutdown, async_on_start, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +42,7 @@ logger = logging.getLogger(__name__)
 @service(
     dynamo={"namespace": "multistage"},
 )
+@timed_init
 class Backend:
     """Backend worker that processes text and optionally queues tasks."""
 
@@ -41,37 +51,116 @@ class Backend:
         self.sleep_time = config.get("Backend", {}).get("sleep_time", 1)
         self.queue_enabled = config.get("Backend", {}).get("queue_enabled", True)
         self.queue_threshold = config.get("Backend", {}).get("queue_threshold", 10)
+        self.enqueue_buffer = config.get("Backend", {}).get("enqueue_buffer", 1024)
+        self.enqueue_batch_size = config.get("Backend", {}).get(
+            "enqueue_batch_size", 32
+        )
+        self.enqueue_flush_interval = config.get("Backend", {}).get(
+            "enqueue_flush_interval", 0.05
+        )
+        self.queue_backend = config.get("Backend", {}).get("queue_backend", "nats")
+        self.shm_path = config.get("Backend", {}).get("shm_path")
+        self.shm_capacity = config.get("Backend", {}).get(
+            "shm_capacity", 16 * 1024 * 1024
+        )
+        self.request_codec, self.response_codec = graph_codecs(config)
+
+        # Pluggable per-word processing function and where it runs
+        self.process_fn = load_function(
+            config.get("Backend", {}).get("process_fn", "components.utils:greet_word")
+        )
+        self.offload = ComputeOffload(
+            config.get("Backend", {}).get("executor", "inline"),
+            config.get("Backend", {}).get("pool_size"),
+        )
+
+        # Optional continuous batching across in-flight requests
+        self.scheduling = config.get("Backend", {}).get("scheduling", "fifo")
+        if self.scheduling not in ["fifo", "fair"]:
+            logger.warning(
+                f"Invalid scheduling '{self.scheduling}', defaulting to 'fifo'"
+            )
+            self.scheduling = "fifo"
+        self.scheduler: Optional[StepBatchScheduler] = None
+        if config.get("Backend", {}).get("batching_enabled", False):
+            fair_queue = None
+            if self.scheduling == "fair":
+                fair_queue = WeightedFairQueue(
+                    weights=config.get("Backend", {}).get("priority_weights", {}),
+                )
+            self.scheduler = StepBatchScheduler(
+                self._process_batch,
+                step_time=self.sleep_time,
+                max_batch_size=config.get("Backend", {}).get("max_batch_size", 8),
+                max_wait_ms=config.get("Backend", {}).get("max_wait_ms", 5),
+                fair_queue=fair_queue,
+            )
+        elif self.scheduling == "fair":
+            # Without batching every stream advances on its own; there is no slot to share
+            logger.warning(
+                "scheduling 'fair' needs batching_enabled; using unbatched processing"
+            )
+        self.class_latency = ClassLatency()
 
         # Worker identification
         self.worker_id = f"{socket.gethostname()}_{os.getpid()}"
         self.nats_server = os.environ.get("NATS_SERVER", "nats://localhost:4222")
-        self.queue: Optional[NatsQueue] = None
+        self.queue: Optional[TaskQueue] = None
+        self.enqueuer: Optional[BackgroundEnqueuer] = None
+
+        # Streams abandoned by their caller, and the processing time that skipped
+        self.cancelled_requests = 0
+        self.saved_worker_seconds = 0.0
+        # Requests dropped or cut short because their deadline passed
+        self.expired_requests = 0
+        self.expired_worker_seconds = 0.0
 
         logger.info(f"Backend worker {self.worker_id} initialized")
-        logger.info(f"Queue enabled: {self.queue_enabled}, threshold: {self.queue_threshold}")
+        logger.info(
+            f"Queue enabled: {self.queue_enabled}, threshold: {self.queue_threshold}"
+        )
 
     @async_on_start
     async def setup_queue(self):
         """Initialize queue connection if enabled"""
-        if self.queue_enabled:
-            try:
-                self.queue = NatsQueue(
-                    stream_name="text_processing",
-                    nats_server=self.nats_server,
-                    dequeue_timeout=1.0
-                )
-                await self.queue.connect()
-                logger.info("Queue connection established")
-            except Exception as e:
-                logger.error(f"Failed to connect to queue: {e}")
-                self.queue_enabled = False
+        async with timeline.phase("Backend", "setup_queue"):
+            if self.queue_enabled:
+                try:
+                    self.queue = make_queue(
+                        self.queue_backend,
+                        "text_processing",
+                        dequeue_timeout=1.0,
+                        nats_server=self.nats_server,
+                        shm_path=self.shm_path,
+                        shm_capacity=self.shm_capacity,
+                    )
+                    await self.queue.connect()
+                    self.enqueuer = BackgroundEnqueuer(
+                        self.queue,
+                        max_buffer=self.enqueue_buffer,
+                        batch_size=self.enqueue_batch_size,
+                        flush_interval=self.enqueue_flush_interval,
+                    )
+                    logger.info("Queue connection established")
+                except Exception as e:
+                    logger.error(f"Failed to connect to queue: {e}")
+                    self.queue_enabled = False
+        startup_complete("Backend")
 
     @async_on_shutdown
     async def cleanup_queue(self):
-        """Clean up queue connection"""
+        """Flush buffered tasks and clean up queue connection"""
+        if self.enqueuer:
+            await self.enqueuer.close()
+            logger.info(f"Enqueue stats at shutdown: {self.enqueuer.stats()}")
         if self.queue:
             await self.queue.close()
 
+    @async_on_shutdown
+    async def cleanup_offload(self):
+        """Shut down the processing pool"""
+        self.offload.shutdown()
+
     async def _should_queue_task(self, text: str) -> bool:
         """Determine if task should be queued based on criteria"""
         if not self.queue_enabled or not self.queue:
@@ -80,100 +169,209 @@ class Backend:
         # Queue longer texts for additional processing
         return len(text.split()) > self.queue_threshold
 
-    async def _queue_task(self, request: TextRequest):
-        """Queue a task for additional processing"""
-        if self.queue:
+    def _queue_task(self, request: TextRequest):
+        """Hand a task to the background enqueuer for additional processing"""
+        if self.enqueuer:
             task = QueueTask(
                 text=request.text,
                 request_id=request.request_id,
                 greeting=request.greeting or "Hello",
-                source_worker=self.worker_id
+                source_worker=self.worker_id,
+                deadline=request.deadline,
             )
-            try:
-                encoded_task = msgspec.json.encode(task)
-                await self.queue.enqueue_task(encoded_task)
-                logger.info(f"Queued task {request.request_id} for additional processing")
-            except Exception as e:
-                logger.error(f"Failed to queue task: {e}")
+            encoded_task = msgspec.json.encode(task)
+            if self.enqueuer.submit(encoded_task):
+                logger.info(
+                    f"Buffered task {request.request_id} for additional processing"
+                )
+
+    async def _process_batch(self, items: list[tuple[str, str]]) -> list[str]:
+        """Process one word from each stream in the batch"""
+        return await self.offload.run_batch(self.process_fn, items)
+
+    async def _generate_words(
+        self, greeting: str, words: list[str], flow: tuple[str, str]
+    ):
+        """Yield processed words, one at a time or through the batch scheduler"""
+        if self.scheduler is not None:
+            items = [(greeting, word) for word in words]
+            async with aclosing(self.scheduler.submit(items, flow)) as outputs:
+                async for processed in outputs:
+                    yield processed
+            return
+
+        for word in words:
+            # Simulate processing time
+            await asyncio.sleep(self.sleep_time)
+            yield await self.offload.run(self.process_fn, greeting, word)
+
+    def _expire(self, request: TextRequest, skipped_words: int):
+        self.expired_requests += 1
+        self.expired_worker_seconds += skipped_words * self.sleep_time
+        logger.info(
+            f"Backend {self.worker_id} dropped expired {request.request_id}, "
+            f"skipping {skipped_words} words"
+        )
+
+    @endpoint()
+    async def stats(self, raw_request: str):
+        """Return Backend counters as JSON"""
+        yield json.dumps(
+            {
+                "enqueue": self.enqueuer.stats() if self.enqueuer else None,
+                "cancelled_requests": self.cancelled_requests,
+                "saved_worker_seconds": round(self.saved_worker_seconds, 3),
+                "expired_requests": self.expired_requests,
+                "expired_worker_seconds": round(self.expired_worker_seconds, 3),
+                "scheduling": self.scheduling,
+                "classes": self.class_latency.stats(),
+            }
+        )
 
     @endpoint()
     async def process_text(self, raw_request: str):
         """Process text and stream results."""
-        request = TextRequest.model_validate_json(raw_request)
+        first_request("Backend")
+        request = self.request_codec.decode(raw_request)
         logger.info(f"Backend {self.worker_id} processing: {request.request_id}")
 
+        if expired(request.deadline):
+            self._expire(request, len(split_words(request.text)))
+            raise DeadlineExceeded(
+                f"Request {request.request_id} expired before the Backend"
+            )
+
         # Check if we should queue this task
         if await self._should_queue_task(request.text):
-            await self._queue_task(request)
-            # Continue processing normally
+            # Never waits on the queue; sent in the background
+            self._queue_task(request)
 
         # Process each word with configured greeting
         greeting = request.greeting or "Hello"
-        words = request.text.split(",") if "," in request.text else request.text.split()
+        words = split_words(request.text)
 
-        for i, word in enumerate(words):
-            # Simulate processing time
-            await asyncio.sleep(self.sleep_time)
+        priority = request.priority or DEFAULT_CLASS
+        flow = (priority, request.tenant or "")
+        started = time.monotonic()
+        first_chunk_at = None
 
-            response = TextResponse(
-                processed_text=f"{greeting} {word.strip()}!",
-                request_id=request.request_id,
-                worker_id=self.worker_id
+        produced = 0
+        try:
+            async with aclosing(self._generate_words(greeting, words, flow)) as outputs:
+                async for processed in outputs:
+                    response = self.response_codec.new(
+                        processed_text=processed,
+                        request_id=request.request_id,
+                        worker_id=self.worker_id,
+                    )
+                    produced += 1
+                    if first_chunk_at is None:
+                        first_chunk_at = time.monotonic()
+                    yield self.response_codec.encode(response)
+                    if produced < len(words) and expired(request.deadline):
+                        # Stop mid-stream; the rest would arrive after the client gave up
+                        self._expire(request, len(words) - produced)
+                        done = f"{produced}/{len(words)}"
+                        raise DeadlineExceeded(
+                            f"Request {request.request_id} expired after {done} words"
+                        )
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller went away; the words left are never processed
+            self.cancelled_requests += 1
+            self.saved_worker_seconds += (len(words) - produced) * self.sleep_time
+            logger.info(
+                f"Backend {self.worker_id} cancelled {request.request_id} "
+                f"after {produced}/{len(words)} words"
+            )
+            raise
+        if first_chunk_at is not None:
+            self.class_latency.record(
+                priority, first_chunk_at - started, time.monotonic() - started
             )
-
-            yield response.model_dump_json()
 
 
 @service(
     dynamo={"namespace": "multistage"},
 )
+@timed_init
 class QueueWorker:
     """Worker that pulls and processes tasks from the queue."""
 
     def __init__(self):
+        config = ServiceConfig.get_instance()
+        worker_config = config.get("QueueWorker", {})
+        self.prefetch = worker_config.get("prefetch", 16)
+        self.concurrency = worker_config.get("concurrency", 8)
+        self.dequeue_timeout = worker_config.get("dequeue_timeout", 1.0)
+        self.max_backoff = worker_config.get("max_backoff", 1.0)
+        self.stats_interval = worker_config.get("stats_interval", 30)
+        self.queue_backend = worker_config.get("queue_backend", "nats")
+        self.shm_path = worker_config.get("shm_path")
+        self.shm_capacity = worker_config.get("shm_capacity", 16 * 1024 * 1024)
+
         self.worker_id = f"queue_{socket.gethostname()}_{os.getpid()}"
         self.nats_server = os.environ.get("NATS_SERVER", "nats://localhost:4222")
-        self.processing = True
-        self.queue: Optional[NatsQueue] = None
+        self.queue: Optional[TaskQueue] = None
+        self.consumer: Optional[QueueConsumer] = None
+        self.expired_tasks = 0
         logger.info(f"Queue worker {self.worker_id} initialized")
 
     @async_on_start
     async def start_processing(self):
         """Start processing tasks from queue"""
-        self.queue = NatsQueue(
-            stream_name="text_processing",
-            nats_server=self.nats_server,
-            dequeue_timeout=1.0
-        )
-        try:
-            await self.queue.connect()
-            logger.info("Queue worker connected to NATS")
-            asyncio.create_task(self._process_queue())
-        except Exception as e:
-            logger.error(f"Failed to connect to queue: {e}")
-
-    async def _process_queue(self):
-        """Continuously process tasks from queue"""
-        while self.processing and self.queue:
+        async with timeline.phase("QueueWorker", "start_processing"):
+            self.queue = make_queue(
+                self.queue_backend,
+                "text_processing",
+                dequeue_timeout=self.dequeue_timeout,
+                nats_server=self.nats_server,
+                shm_path=self.shm_path,
+                shm_capacity=self.shm_capacity,
+            )
             try:
-                task_data = await self.queue.dequeue_task()
-                if task_data:
-                    task = msgspec.json.decode(task_data, type=QueueTask)
-                    logger.info(f"Queue worker processing task {task.request_id}")
-                    # Process the task (could be more complex processing)
-                    processed = f"[QUEUED] {task.greeting} {task.text} (from {task.source_worker})"
-                    logger.info(f"Processed: {processed}")
-                    # In a real system, might save results or trigger other actions
-                else:
-                    # No task available, wait a bit
-                    await asyncio.sleep(0.1)
+                await self.queue.connect()
+                logger.info(f"Queue worker connected to {self.queue_backend} queue")
+                self.consumer = QueueConsumer(
+                    self.queue,
+                    self._process_task,
+                    prefetch=self.prefetch,
+                    concurrency=self.concurrency,
+                    max_backoff=self.max_backoff,
+                )
+                asyncio.create_task(self.consumer.run())
+                asyncio.create_task(self._log_stats())
             except Exception as e:
-                logger.error(f"Error processing queue task: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"Failed to connect to queue: {e}")
+        startup_complete("QueueWorker")
+
+    async def _process_task(self, task: QueueTask):
+        """Process a single queued task"""
+        if expired(task.deadline):
+            self.expired_tasks += 1
+            logger.info(f"Queue worker skipping expired task {task.request_id}")
+            return
+        logger.info(f"Queue worker processing task {task.request_id}")
+        # Process the task (could be more complex processing)
+        processed = f"[QUEUED] {task.greeting} {task.text} (from {task.source_worker})"
+        logger.info(f"Processed: {processed}")
+        # In a real system, might save results or trigger other actions
+
+    async def _log_stats(self):
+        """Periodically log dequeue rate, processing rate and backlog"""
+        while self.consumer and self.consumer.running:
+            await asyncio.sleep(self.stats_interval)
+            logger.info(f"Queue worker {self.worker_id} stats: {self.consumer.stats()}")
+
+    @endpoint()
+    async def stats(self, raw_request: str):
+        """Return queue consumer counters as JSON"""
+        stats = self.consumer.stats() if self.consumer else {}
+        yield json.dumps({**stats, "expired_tasks": self.expired_tasks})
 
     @async_on_shutdown
     async def stop_processing(self):
         """Stop processing queue"""
-        self.processing = False
+        if self.consumer:
+            await self.consumer.stop()
         if self.queue:
             await self.queue.close()
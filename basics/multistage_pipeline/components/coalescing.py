@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FanOut:
+    """Buffers one stream's chunks and replays them to any number of subscribers.
+
+    A subscriber that joins late first receives every chunk produced so far,
+    then follows the live stream.
+    """
+
+    def __init__(self, max_replay: int = 256):
+        self.chunks: List[Any] = []
+        self.max_replay = max_replay
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def joinable(self) -> bool:
+        return not self.done and len(self.chunks) <= self.max_replay
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, chunk):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def pump(self, source: AsyncIterator):
+        """Drain the source into the buffer; runs as its own task"""
+        try:
+            async for chunk in source:
+                self.append(chunk)
+        except asyncio.CancelledError:
+            self.finish(asyncio.CancelledError())
+            raise
+        except Exception as e:
+            self.finish(e)
+        else:
+            self.finish()
+        finally:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+    def subscribe(self) -> AsyncIterator:
+        # Counted when handed out, so a joiner that has not started reading
+        # yet keeps the upstream alive
+        self.subscribers += 1
+        return self._replay()
+
+    async def _replay(self):
+        try:
+            index = 0
+            while True:
+                while index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done and self.task is not None:
+                # Every client went away; stop the upstream stream
+                self.task.cancel()
+
+
+class SingleFlight:
+    """Coalesces identical in-flight streams onto one upstream call.
+
+    The first request for a key starts the upstream stream and later
+    identical requests subscribe to it until it completes. Once a stream has
+    produced more than ``max_replay`` chunks it stops accepting new
+    subscribers, which bounds how much a late joiner replays.
+    """
+
+    def __init__(self, max_replay: int = 256):
+        self.max_replay = max_replay
+        self.flights: Dict[Hashable, FanOut] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def subscribe(
+        self, key: Hashable, source: Callable[[], AsyncIterator]
+    ) -> Tuple[AsyncIterator, bool]:
+        """Return (stream, is_leader); ``source`` is only called for a new flight"""
+        flight = self.flights.get(key)
+        if flight is not None and flight.joinable:
+            self.coalesced += 1
+            return flight.subscribe(), False
+
+        flight = FanOut(self.max_replay)
+        self.flights[key] = flight
+        self.leaders += 1
+        flight.task = asyncio.create_task(flight.pump(source()))
+        flight.task.add_done_callback(lambda _: self._remove(key, flight))
+        return flight.subscribe(), True
+
+    def _remove(self, key: Hashable, flight: FanOut):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    def stats(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_ratio": self.coalesced / total if total else 0.0,
+            "in_flight": len(self.flights),
+        }
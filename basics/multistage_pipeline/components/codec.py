@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from components.utils import TextRequest, TextRequestMsg, TextResponse, TextResponseMsg
+from components.wire import (  # noqa: F401 (DECODE_ERRORS is re-exported)
+    DECODE_ERRORS,
+    Codec,
+    LocalCodec,
+    MsgpackCodec,
+    MsgspecJsonCodec,
+    PydanticCodec,
+    wire_codec_setting,
+)
+
+logger = logging.getLogger(__name__)
+
+CODECS = {
+    "pydantic": (PydanticCodec, TextRequest, TextResponse),
+    "msgspec-json": (MsgspecJsonCodec, TextRequestMsg, TextResponseMsg),
+    "msgpack": (MsgpackCodec, TextRequestMsg, TextResponseMsg),
+    "local": (LocalCodec, TextRequestMsg, TextResponseMsg),
+}
+
+
+def make_codecs(name: str) -> tuple[Codec, Codec]:
+    """Return (request_codec, response_codec) for a wire_codec config value"""
+    if name not in CODECS:
+        logger.warning(f"Unknown wire_codec '{name}', defaulting to 'pydantic'")
+        name = "pydantic"
+    codec_cls, request_type, response_type = CODECS[name]
+    return codec_cls(request_type), codec_cls(response_type)
+
+
+def graph_codecs(config) -> tuple[Codec, Codec]:
+    """Return (request_codec, response_codec) for the graph's wire_codec setting"""
+    return make_codecs(wire_codec_setting(config, CODECS))
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_CLASS = "default"
+
+
+class WeightedFairQueue:
+    """Start-time fair queuing of work items across flows.
+
+    A flow is a ``(priority, tenant)`` pair and gets a share of the service
+    proportional to its priority's weight; flows of the same priority share
+    equally. Every item costs one unit, so a flow with weight 4 has four
+    items served for each item of a flow with weight 1 while both are
+    backlogged. Items of one flow are served in order, so streams that put
+    their next item back after each step take turns within their flow.
+    """
+
+    def __init__(
+        self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0
+    ):
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.virtual_time = 0.0
+        self.finish: Dict[Hashable, float] = {}
+        self.heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def weight(self, flow: Hashable) -> float:
+        priority = flow[0] if isinstance(flow, tuple) else flow
+        return max(self.weights.get(priority, self.default_weight), 1e-6)
+
+    def push(self, flow: Hashable, item: Any):
+        # A flow that was idle starts at the current virtual time rather
+        # than using up credit it did not claim while away
+        start = max(self.virtual_time, self.finish.get(flow, 0.0))
+        self.finish[flow] = start + 1 / self.weight(flow)
+        heapq.heappush(self.heap, (start, next(self._seq), item))
+        if len(self.finish) > 2 * len(self.heap) + 64:
+            self._prune()
+
+    def pop(self) -> Any:
+        start, _, item = heapq.heappop(self.heap)
+        self.virtual_time = start
+        return item
+
+    def _prune(self):
+        """Forget flows whose tags are behind virtual time; push() treats them the same"""
+        self.finish = {
+            flow: tag for flow, tag in self.finish.items() if tag > self.virtual_time
+        }
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+class ClassLatency:
+    """Recent time to first chunk and completion latency per priority class"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.ttfc: Dict[str, Deque[float]] = {}
+        self.latency: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def record(self, priority: str, ttfc: float, latency: float):
+        if priority not in self.counts:
+            self.ttfc[priority] = deque(maxlen=self.window)
+            self.latency[priority] = deque(maxlen=self.window)
+            self.counts[priority] = 0
+        self.ttfc[priority].append(ttfc)
+        self.latency[priority].append(latency)
+        self.counts[priority] += 1
+
+    def stats(self) -> dict:
+        result = {}
+        for priority, count in self.counts.items():
+            ttfc = sorted(self.ttfc[priority])
+            latency = sorted(self.latency[priority])
+            result[priority] = {
+                "requests": count,
+                "ttfc_p50": _percentile(ttfc, 50),
+                "ttfc_p99": _percentile(ttfc, 99),
+                "latency_p50": _percentile(latency, 50),
+                "latency_p99": _percentile(latency, 99),
+            }
+        return result
@@ -13,29 +13,46 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
-from dynamo.runtime.logging import configure_dynamo_logging
-from dynamo.sdk import api, service, depends
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+import math
+import time
 from typing import Optional
 
+from components.admission import AdmissionController, AdmissionRejected, make_limit
+from components.coalescing import SingleFlight
+from components.codec import graph_codecs
+from components.deadlines import deadline_after, expired
+
 # Import from this package
 from components.middle import Middle
-from components.utils import TextRequest
+from components.profiling import first_request, startup_complete, timed_init
+from components.streams import close_stream
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from dynamo.runtime.logging import configure_dynamo_logging
+from dynamo.sdk import api, async_on_start, depends, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
 
 logger = logging.getLogger(__name__)
 
 
 class HTTPRequest(BaseModel):
     """HTTP request model"""
+
     text: str
     request_id: Optional[str] = None
+    timeout_ms: Optional[float] = None  # Overrides the configured request_timeout_ms
+    priority: Optional[str] = None
+    tenant: Optional[str] = None
 
 
 @service(
     dynamo={"namespace": "multistage"},
 )
+@timed_init
 class Frontend:
     """Frontend HTTP API that forwards requests to the processing pipeline."""
 
@@ -44,22 +61,196 @@ class Frontend:
     def __init__(self) -> None:
         # Configure logging
         configure_dynamo_logging(service_name="Frontend")
+
+        # HTTP stays on Pydantic; only inter-component messages use the wire codec
+        config = ServiceConfig.get_instance()
+        self.request_codec, self.response_codec = graph_codecs(config)
+
+        # Default time budget; carried downstream as an absolute deadline
+        self.request_timeout_ms = config.get("Frontend", {}).get(
+            "request_timeout_ms", None
+        )
+        self.expired_requests = 0
+
+        # Identical in-flight requests share one pipeline stream
+        self.coalescer = None
+        if config.get("Frontend", {}).get("coalesce", False):
+            self.coalescer = SingleFlight(
+                max_replay=config.get("Frontend", {}).get("coalesce_max_replay", 256)
+            )
+        # Requests whose deadlines round down to the same bucket can share a stream
+        self.coalesce_deadline_bucket = (
+            config.get("Frontend", {}).get("coalesce_deadline_bucket_ms", 100) / 1000
+        )
+        has_deadlines = self.request_timeout_ms is not None
+        no_buckets = self.coalesce_deadline_bucket <= 0
+        if self.coalescer is not None and has_deadlines and no_buckets:
+            logger.warning(
+                "coalesce_deadline_bucket_ms is 0, so requests with a deadline (every "
+                "request, with request_timeout_ms set) are never coalesced"
+            )
+
+        # Concurrency limit and bounded wait queue in front of the pipeline
+        self.admission = None
+        frontend_config = config.get("Frontend", {})
+        if frontend_config.get("admission_enabled", False):
+            latency_target_ms = frontend_config.get("admission_latency_target_ms", 500)
+            queue_timeout_ms = frontend_config.get("admission_queue_timeout_ms", 1000)
+            self.admission = AdmissionController(
+                make_limit(
+                    frontend_config.get("admission_limit", "gradient"),
+                    initial=frontend_config.get("admission_initial_limit", 32),
+                    min_limit=frontend_config.get("admission_min_limit", 4),
+                    max_limit=frontend_config.get("admission_max_limit", 256),
+                    latency_target=latency_target_ms / 1000,
+                ),
+                max_queue=frontend_config.get("admission_max_queue", 64),
+                queue_timeout=queue_timeout_ms / 1000,
+            )
         logger.info("Frontend service initialized")
 
+    @async_on_start
+    async def async_init(self):
+        startup_complete("Frontend")
+
     @api()
     async def generate(self, request: HTTPRequest):
         """Stream results from the multi-stage pipeline."""
-        logger.info(f"Frontend received request: text='{request.text}', id='{request.request_id}'")
+        first_request("Frontend")
+        logger.info(
+            f"Frontend received request: text='{request.text}', id='{request.request_id}'"
+        )
 
-        # Create internal request
-        text_request = TextRequest(
-            text=request.text,
-            request_id=request.request_id or f"req_{id(request)}"
+        deadline = deadline_after(
+            request.timeout_ms
+            if request.timeout_ms is not None
+            else self.request_timeout_ms
         )
+        coalesce = self.coalescer is not None and (
+            deadline is None or self.coalesce_deadline_bucket > 0
+        )
+        if coalesce and deadline is not None:
+            # Give up to one bucket of the budget so that requests arriving close
+            # together share an identical deadline, and with it one stream
+            bucket = self.coalesce_deadline_bucket
+            deadline = math.floor(deadline / bucket) * bucket
+
+        permit = None
+        if self.admission is not None:
+            # Never wait for a slot past the request's own deadline
+            timeout = None
+            if deadline is not None:
+                timeout = min(
+                    self.admission.queue_timeout, max(deadline - time.time(), 0)
+                )
+            try:
+                permit = await self.admission.acquire(timeout)
+            except AdmissionRejected as e:
+                logger.warning(f"Shedding request {request.request_id}: {e.reason}")
+                return JSONResponse(
+                    status_code=e.status,
+                    content={"error": e.reason},
+                    headers={"Retry-After": str(e.retry_after)},
+                )
+
+        try:
+            if expired(deadline):
+                self.expired_requests += 1
+                if permit is not None:
+                    permit.cancel()
+                return JSONResponse(
+                    status_code=504, content={"error": "deadline exceeded"}
+                )
 
-        # Stream response from middle component
-        async def response_generator():
-            async for response in self.middle.process(text_request.model_dump_json()):
-                yield f"{response}\n"
+            # Create internal request
+            text_request = self.request_codec.new(
+                text=request.text,
+                request_id=request.request_id or f"req_{id(request)}",
+                deadline=deadline,
+                priority=request.priority,
+                tenant=request.tenant,
+            )
 
-        return StreamingResponse(response_generator(), media_type="text/plain")
+            # Stream response from middle component
+            def pipeline_stream():
+                return self.middle.process(self.request_codec.encode(text_request))
+
+            async def response_generator():
+                ttfc = None
+                failed = False
+                stream = None
+                try:
+                    if not coalesce:
+                        stream, leader = pipeline_stream(), True
+                    else:
+                        # Key includes the deadline: a shared stream ends at the leader's
+                        stream, leader = self.coalescer.subscribe(
+                            (
+                                text_request.text,
+                                text_request.greeting,
+                                text_request.priority,
+                                text_request.tenant,
+                                deadline,
+                            ),
+                            pipeline_stream,
+                        )
+                    async for response in stream:
+                        if ttfc is None and permit is not None:
+                            ttfc = time.monotonic() - permit.started
+                        if not leader:
+                            # Shared chunks carry the first request's id
+                            response = self._with_request_id(
+                                response, text_request.request_id
+                            )
+                        yield f"{self.response_codec.to_json(response)}\n"
+                except Exception:
+                    failed = True
+                    if not expired(deadline):
+                        raise
+                    # Dropped at its deadline downstream: end with a marker, not a cut-off
+                    self.expired_requests += 1
+                    yield f"{json.dumps({'error': 'deadline exceeded'})}\n"
+                finally:
+                    # Runs when the HTTP client disconnects: stop Middle, and so the Backend
+                    if stream is not None:
+                        await close_stream(stream)
+                    if permit is not None:
+                        if ttfc is None and not failed:
+                            # Client left before the first chunk: no latency to learn from
+                            permit.cancel()
+                        else:
+                            # The limit adapts to time to first chunk, which grows with
+                            # queueing downstream
+                            permit.release(ttfc, dropped=failed)
+
+            # The generator's finally misses bodies that are never iterated; the
+            # background task runs after the response either way (release is idempotent)
+            return StreamingResponse(
+                response_generator(),
+                media_type="text/plain",
+                background=BackgroundTask(permit.cancel)
+                if permit is not None
+                else None,
+            )
+        except BaseException:
+            # Anything raising between admission and the response must still free the slot
+            if permit is not None:
+                permit.cancel()
+            raise
+
+    def _with_request_id(self, raw_response, request_id: str):
+        codec = self.response_codec
+        return codec.encode(
+            codec.replace(codec.decode(raw_response), request_id=request_id)
+        )
+
+    @endpoint()
+    async def stats(self, raw_request: str):
+        """Return request coalescing, admission and deadline counters as JSON"""
+        yield json.dumps(
+            {
+                "expired_requests": self.expired_requests,
+                "coalescing": self.coalescer.stats() if self.coalescer else None,
+                "admission": self.admission.stats() if self.admission else None,
+            }
+        )
@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from components.streams import close_stream
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of requests.
+
+    Every request deposits ``ratio`` tokens, up to ``burst``, and a hedge
+    spends one, so hedges never exceed ``ratio`` times the requests seen
+    plus ``burst``.
+    """
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0):
+        self.ratio = max(ratio, 0.0)
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+
+    def deposit(self):
+        self.tokens = min(self.tokens + self.ratio, self.burst)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def refund(self):
+        self.tokens = min(self.tokens + 1.0, self.burst)
+
+
+class LatencyWindow:
+    """Sliding window of recent latencies with a cached percentile"""
+
+    def __init__(
+        self, size: int = 1000, percentile: float = 95.0, refresh_every: int = 16
+    ):
+        self.samples: deque = deque(maxlen=max(size, 1))
+        self.percentile = min(max(percentile, 0.0), 100.0)
+        self.refresh_every = max(refresh_every, 1)
+        self._since_refresh = 0
+        self._value: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every:
+            self._value = None
+
+    def value(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        if self._value is None:
+            ordered = sorted(self.samples)
+            index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+            self._value = ordered[index]
+            self._since_refresh = 0
+        return self._value
+
+
+async def _settle(task: "asyncio.Future"):
+    """Cancel a pending first-chunk read and wait for it to unwind"""
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+class Hedger:
+    """Sends a second copy of a request when the first one is slow to answer.
+
+    If the primary stream has not produced its first chunk after the
+    ``percentile`` of recent times to first chunk, a backup stream is
+    started, as long as the budget allows. Whichever stream produces a
+    first chunk first is streamed to the caller and the other is closed.
+    Until ``min_samples`` latencies have been seen, ``initial_delay`` is
+    used; the delay never drops below ``min_delay``.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.05,
+        initial_delay: float = 0.5,
+        budget: float = 0.05,
+        burst: float = 10.0,
+        window: int = 1000,
+        min_samples: int = 20,
+    ):
+        self.latencies = LatencyWindow(window, percentile)
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(budget, burst)
+        self.requests = 0
+        self.issued = 0
+        self.won = 0
+        self.over_budget = 0
+        self.no_backup = 0
+
+    def delay(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return max(self.initial_delay, self.min_delay)
+        return max(self.latencies.value(), self.min_delay)
+
+    async def stream(
+        self,
+        primary: AsyncIterator,
+        backup: Callable[[], Awaitable[Optional[AsyncIterator]]],
+    ) -> AsyncIterator:
+        """Stream ``primary``, racing it against ``backup()`` if it is slow.
+
+        ``backup`` is only called when a hedge is sent, and may return None
+        when there is no other worker to send it to. If it raises, the hedge
+        is counted as ``no_backup`` and the primary keeps streaming.
+        """
+        self.requests += 1
+        self.budget.deposit()
+        started = time.monotonic()
+        streams = {primary}
+        reads = {}
+        try:
+            reads[asyncio.ensure_future(primary.__anext__())] = primary
+            done, _ = await asyncio.wait(reads, timeout=self.delay())
+            if not done:
+                second = None
+                if not self.budget.try_spend():
+                    self.over_budget += 1
+                else:
+                    try:
+                        second = await backup()
+                    except Exception as e:
+                        # Failing to place a hedge must not break a working primary
+                        logger.warning(
+                            f"Could not start hedge, continuing with the primary: {e}"
+                        )
+                    if second is None:
+                        self.no_backup += 1
+                        self.budget.refund()
+                if second is not None:
+                    self.issued += 1
+                    streams.add(second)
+                    reads[asyncio.ensure_future(second.__anext__())] = second
+                    logger.info(
+                        f"Hedged request after {time.monotonic() - started:.3f}s"
+                    )
+
+            # The first stream to produce a chunk (or finish) wins; a failure
+            # only decides the race when no other stream is left
+            while True:
+                done, _ = await asyncio.wait(reads, return_when=asyncio.FIRST_COMPLETED)
+                read = next(iter(done))
+                stream = reads.pop(read)
+                error = read.exception()
+                if error is None or isinstance(error, StopAsyncIteration) or not reads:
+                    break
+                logger.warning(f"Hedged stream failed before its first chunk: {error}")
+                streams.discard(stream)
+                await close_stream(stream)
+
+            winner = stream
+            if winner is not primary:
+                self.won += 1
+            for pending in list(reads):
+                del reads[pending]
+                await _settle(pending)
+            for loser in streams - {winner}:
+                await close_stream(loser)
+            streams = {winner}
+
+            try:
+                head = read.result()
+            except StopAsyncIteration:
+                return
+            self.latencies.add(time.monotonic() - started)
+            yield head
+            async for item in winner:
+                yield item
+        finally:
+            # Also runs when the caller disconnects mid-race
+            for pending in reads:
+                await _settle(pending)
+            for stream in streams:
+                await close_stream(stream)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedges_issued": self.issued,
+            "hedges_won": self.won,
+            "over_budget": self.over_budget,
+            "no_backup": self.no_backup,
+            "delay": self.delay(),
+        }
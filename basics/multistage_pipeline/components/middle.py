@@ -13,18 +13,43 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import logging
-from typing import Optional
-import os
+import random
+import uuid
+from contextlib import aclosing
+from typing import Dict, Optional
 
-from dynamo.sdk import async_on_start, depends, dynamo_context, endpoint, service
+from components.backend import Backend
+from components.codec import DECODE_ERRORS, graph_codecs
+from components.deadlines import DeadlineExceeded, expired
+from components.hedging import Hedger
+from components.profiling import first_request, startup_complete, timed_init
+from components.readiness import check_required_workers, timeline
+from components.response_cache import ResponseCache
+from components.router import Router
+from components.routing import LocalRoutingTable, make_policy
+from components.streams import close_stream
+from components.utils import (
+    LoadUpdate,
+    RouteRequest,
+    TextRequest,
+    WorkerReport,
+    split_words,
+)
+
+from dynamo.runtime import Client
+from dynamo.sdk import (
+    async_on_shutdown,
+    async_on_start,
+    depends,
+    dynamo_context,
+    endpoint,
+    service,
+)
 from dynamo.sdk.lib.config import ServiceConfig
 from dynamo.sdk.lib.dependency import DynamoClient
-from dynamo.runtime import Client
-
-from components.router import Router
-from components.backend import Backend
-from components.utils import TextRequest, TextResponse, check_required_workers
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +57,7 @@ logger = logging.getLogger(__name__)
 @service(
     dynamo={"namespace": "multistage"},
 )
+@timed_init
 class Middle:
     """Processing layer that coordinates between router and backend workers."""
 
@@ -45,30 +71,281 @@ class Middle:
         config = ServiceConfig.get_instance()
         self.routing_mode = config.get("Middle", {}).get("routing_mode", "smart")
         self.min_workers = config.get("Middle", {}).get("min_workers", 2)
+        self.startup_timeout = config.get("Middle", {}).get("startup_timeout", 0)
+        self.min_ready_workers = config.get("Middle", {}).get("min_ready_workers", None)
         self.greeting = config.get("Middle", {}).get("greeting", "Hello")
+        self.progress_interval = max(
+            1, config.get("Middle", {}).get("progress_interval", 4)
+        )
+        self.relay_mode = config.get("Middle", {}).get("relay_mode", "parse")
+        self.validate_sample_rate = config.get("Middle", {}).get(
+            "validate_sample_rate", 0.0
+        )
+        self.request_codec, self.response_codec = graph_codecs(config)
+        self.validated_chunks = 0
+        self.invalid_chunks = 0
+        self.local_routing = config.get("Middle", {}).get("local_routing", False)
+        self.max_staleness_ms = config.get("Middle", {}).get("max_staleness_ms", 500)
+        self.local_selection_policy = config.get("Middle", {}).get(
+            "local_selection_policy", "power_of_two"
+        )
+        # Shared with the Router so consistent_hash maps a prefix to the same worker
+        self.policy_options = config.get("Router", {}).get("policy_options", {})
+        self.routing_table = None
+        self.local_decisions = 0
+        self.rpc_decisions = 0
+        self.cancelled_streams = 0
+        self.expired_requests = 0
+        self._pending_reports: set[asyncio.Task] = set()
+        self._lease_reports: Dict[
+            str, asyncio.Task
+        ] = {}  # latest report task per lease
+
+        # Optional cache of complete Backend response streams
+        self.cache = None
+        self.cache_replay = config.get("Middle", {}).get("cache_replay", "immediate")
+        self.cache_namespace = config.get("Middle", {}).get("cache_namespace", "v1")
+        if config.get("Middle", {}).get("cache_enabled", False):
+            self.cache = ResponseCache(
+                max_bytes=config.get("Middle", {}).get(
+                    "cache_max_bytes", 64 * 1024 * 1024
+                ),
+                ttl=config.get("Middle", {}).get("cache_ttl", 300),
+                disk_path=config.get("Middle", {}).get("cache_disk_path"),
+                disk_bytes=config.get("Middle", {}).get(
+                    "cache_disk_bytes", 256 * 1024 * 1024
+                ),
+            )
+
+        # Optional hedging of slow Backend streams to a second worker (smart mode)
+        self.hedger = None
+        if config.get("Middle", {}).get("hedge_enabled", False):
+            initial_delay_ms = config.get("Middle", {}).get(
+                "hedge_initial_delay_ms", 500
+            )
+            self.hedger = Hedger(
+                percentile=config.get("Middle", {}).get("hedge_percentile", 95),
+                min_delay=config.get("Middle", {}).get("hedge_min_delay_ms", 50) / 1000,
+                initial_delay=initial_delay_ms / 1000,
+                budget=config.get("Middle", {}).get("hedge_budget", 0.05),
+                burst=config.get("Middle", {}).get("hedge_burst", 10),
+                window=config.get("Middle", {}).get("hedge_window", 1000),
+            )
 
         # Validate routing mode
         if self.routing_mode not in ["smart", "random"]:
-            logger.warning(f"Invalid routing_mode '{self.routing_mode}', defaulting to 'smart'")
+            logger.warning(
+                f"Invalid routing_mode '{self.routing_mode}', defaulting to 'smart'"
+            )
             self.routing_mode = "smart"
 
-        logger.info(f"Middle initialized: routing_mode={self.routing_mode}, min_workers={self.min_workers}")
+        if self.relay_mode not in ["parse", "passthrough"]:
+            logger.warning(
+                f"Invalid relay_mode '{self.relay_mode}', defaulting to 'parse'"
+            )
+            self.relay_mode = "parse"
+
+        if self.cache_replay not in ["immediate", "paced"]:
+            logger.warning(
+                f"Invalid cache_replay '{self.cache_replay}', defaulting to 'immediate'"
+            )
+            self.cache_replay = "immediate"
+
+        logger.info(
+            f"Middle initialized: routing_mode={self.routing_mode}, "
+            f"min_workers={self.min_workers}"
+        )
 
     @async_on_start
     async def async_init(self):
-        runtime = dynamo_context["runtime"]
-        backend_ns, backend_name = Backend.dynamo_address()
-        self.backend_client = (
-            await runtime.namespace(backend_ns)
-            .component(backend_name)
-            .endpoint("process_text")
-            .client()
-        )
+        async with timeline.phase("Middle", "async_init"):
+            runtime = dynamo_context["runtime"]
+            backend_ns, backend_name = Backend.dynamo_address()
+            self.backend_client = (
+                await runtime.namespace(backend_ns)
+                .component(backend_name)
+                .endpoint("process_text")
+                .client()
+            )
+
+            # Wait for minimum workers; wakes as soon as they are visible
+            await check_required_workers(
+                self.backend_client,
+                self.min_workers,
+                tag="[Middle]",
+                timeout=self.startup_timeout,
+                min_ready=self.min_ready_workers,
+            )
+
+            if self.routing_mode == "smart" and self.local_routing:
+                self.routing_table = LocalRoutingTable(
+                    max_staleness=self.max_staleness_ms / 1000,
+                    policy=make_policy(
+                        self.local_selection_policy, **self.policy_options
+                    ),
+                )
+                asyncio.create_task(self._sync_routing_table())
+        startup_complete("Middle")
 
-        # Wait for minimum workers
-        await check_required_workers(
-            self.backend_client, self.min_workers, tag="[Middle]"
+    @async_on_shutdown
+    async def close_cache(self):
+        if self.cache is not None:
+            logger.info(f"Response cache stats at shutdown: {self.cache.stats()}")
+            self.cache.close()
+
+    async def _sync_routing_table(self):
+        """Keep the local routing table in sync with loads pushed by the Router"""
+        while True:
+            try:
+                async for raw_update in self.router.watch_loads(""):
+                    update = LoadUpdate.model_validate_json(raw_update)
+                    if update.full or update.loads or update.removed:
+                        self.routing_table.apply(
+                            update.version, update.loads, update.removed, update.full
+                        )
+                    else:
+                        self.routing_table.touch(update.version)
+            except Exception as e:
+                logger.warning(f"Routing table stream ended: {e}")
+            # A new stream starts over with a full snapshot
+            self.routing_table.version = -1
+            await asyncio.sleep(1)
+
+    async def _select_worker(
+        self, request: TextRequest, lease_id: str, exclude: tuple[int, ...] = ()
+    ):
+        """Pick a worker from the local routing table, or ask the Router if it is stale"""
+        table = self.routing_table
+        if table is not None and table.is_fresh() and not exclude:
+            worker_id = self.routing_table.select(request.text)
+            if worker_id is not None:
+                self.local_decisions += 1
+                logger.info(f"Local routing table selected worker {worker_id}")
+                return str(worker_id)
+
+        self.rpc_decisions += 1
+        route_request = RouteRequest(
+            text=request.text,
+            lease_id=lease_id,
+            exclude=list(exclude),
+            deadline=request.deadline,
         )
+        worker_id = None
+        async for route_response in self.router.get_best_worker(
+            route_request.model_dump_json()
+        ):
+            worker_info = route_response
+            worker_id, score = worker_info.split(":")
+            score = float(score)
+            logger.info(f"Router selected worker {worker_id} with score {score}")
+            break
+        return worker_id
+
+    def _report(self, report: WorkerReport):
+        """Send a lifecycle report to the Router without blocking the stream
+
+        Reports for one lease are chained, so the Router sees start,
+        progress and end in the order they happened.
+        """
+        previous = self._lease_reports.get(report.lease_id)
+        task = asyncio.create_task(self._send_report(report, previous))
+        self._lease_reports[report.lease_id] = task
+        self._pending_reports.add(task)
+        task.add_done_callback(self._pending_reports.discard)
+        task.add_done_callback(lambda t: self._report_sent(report.lease_id, t))
+
+    def _report_sent(self, lease_id: str, task: asyncio.Task):
+        if self._lease_reports.get(lease_id) is task:
+            del self._lease_reports[lease_id]
+
+    async def _send_report(
+        self, report: WorkerReport, previous: Optional[asyncio.Task] = None
+    ):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            async for _ in self.router.report(report.model_dump_json()):
+                pass
+        except Exception as e:
+            logger.warning(
+                f"Failed to send {report.event} report for {report.lease_id}: {e}"
+            )
+
+    async def _stream_from_worker(
+        self, request: TextRequest, worker_id: int, lease_id: str
+    ):
+        """Stream from a Router-selected worker, reporting start, progress and end"""
+        total_units = len(split_words(request.text))
+        completed = 0
+        outcome = "cancelled"
+        backend_generator = None
+        try:
+            payload = self.request_codec.encode(request)
+        except Exception:
+            # A request that cannot be encoded is not the worker's fault: release the
+            # lease as an error, never as "unreachable"
+            self._report(
+                WorkerReport(
+                    lease_id=lease_id,
+                    worker_id=worker_id,
+                    event="error",
+                    total_units=total_units,
+                )
+            )
+            raise
+        try:
+            backend_generator = await self.backend_client.direct(payload, worker_id)
+            self._report(
+                WorkerReport(
+                    lease_id=lease_id,
+                    worker_id=worker_id,
+                    event="start",
+                    total_units=total_units,
+                )
+            )
+            async for resp in backend_generator:
+                completed += 1
+                if completed % self.progress_interval == 0:
+                    self._report(
+                        WorkerReport(
+                            lease_id=lease_id,
+                            worker_id=worker_id,
+                            event="progress",
+                            total_units=total_units,
+                            completed_units=completed,
+                        )
+                    )
+                yield resp
+            outcome = "end"
+        except Exception:
+            # Failing to open the stream means the worker cannot be reached; a failure
+            # after that comes from the request itself and says nothing about the worker
+            outcome = "error" if backend_generator is not None else "unreachable"
+            raise
+        finally:
+            # Also runs on client cancellation (GeneratorExit / CancelledError)
+            if outcome == "cancelled":
+                self.cancelled_streams += 1
+            if backend_generator is not None:
+                await close_stream(backend_generator)
+            self._report(
+                WorkerReport(
+                    lease_id=lease_id,
+                    worker_id=worker_id,
+                    event=outcome,
+                    total_units=total_units,
+                    completed_units=completed,
+                )
+            )
+
+    async def _start_hedge(self, request: TextRequest, primary_id: int):
+        """Ask the Router for a second worker and open a stream to it, if there is one"""
+        lease_id = uuid.uuid4().hex
+        worker_id = await self._select_worker(request, lease_id, exclude=(primary_id,))
+        if not worker_id or worker_id in ("none", "expired"):
+            return None
+        logger.info(f"Hedging request {request.request_id} to worker {worker_id}")
+        return self._stream_from_worker(request, int(worker_id), lease_id)
 
     async def _process_with_routing(self, request: TextRequest):
         """Process request with intelligent or random routing"""
@@ -78,47 +355,134 @@ class Middle:
 
         # Determine routing based on mode
         if self.routing_mode == "smart":
-            # Query router for best worker
-            async for route_response in self.router.get_best_worker(request.text):
-                worker_info = route_response
-                worker_id, score = worker_info.split(":")
-                score = float(score)
-                logger.info(f"Router selected worker {worker_id} with score {score}")
-                break
+            # Query router (or its local replica) for best worker
+            lease_id = uuid.uuid4().hex
+            worker_id = await self._select_worker(request, lease_id)
 
+            if worker_id == "expired":
+                # The deadline passed while waiting for the Router
+                self.expired_requests += 1
+                raise DeadlineExceeded(
+                    f"Request {request.request_id} expired before routing"
+                )
             if worker_id and worker_id != "none":
                 # Use specific worker
-                backend_generator = await self.backend_client.direct(
-                    request.model_dump_json(),
-                    int(worker_id),
+                backend_generator = self._stream_from_worker(
+                    request, int(worker_id), lease_id
                 )
+                if self.hedger is not None:
+                    primary_id = int(worker_id)
+                    backend_generator = self.hedger.stream(
+                        backend_generator,
+                        lambda: self._start_hedge(request, primary_id),
+                    )
             else:
                 # Fallback to random
-                logger.warning("No worker available from router, falling back to random")
+                logger.warning(
+                    "No worker available from router, falling back to random"
+                )
                 backend_generator = await self.backend_client.random(
-                    request.model_dump_json()
+                    self.request_codec.encode(request)
                 )
         elif self.routing_mode == "random":
             backend_generator = await self.backend_client.random(
-                request.model_dump_json()
+                self.request_codec.encode(request)
             )
         else:
             # Should not reach here due to validation in __init__
             logger.error(f"Unexpected routing_mode: {self.routing_mode}, using random")
             backend_generator = await self.backend_client.random(
-                request.model_dump_json()
+                self.request_codec.encode(request)
             )
 
-        # Stream responses from backend
-        async for resp in backend_generator:
-            response = TextResponse.model_validate_json(resp.data())
-            yield response
+        # Stream raw responses from backend
+        try:
+            async for resp in backend_generator:
+                yield resp.data()
+        finally:
+            # Close promptly so the Backend stops and the Router hears about early exits
+            await close_stream(backend_generator)
+
+    def _sample_validate(self, raw_response: str):
+        """Validate a sampled fraction of pass-through chunks"""
+        if random.random() >= self.validate_sample_rate:
+            return
+        self.validated_chunks += 1
+        try:
+            self.response_codec.decode(raw_response)
+        except DECODE_ERRORS as e:
+            self.invalid_chunks += 1
+            logger.warning(f"Invalid chunk from backend: {e}")
+
+    @endpoint()
+    async def stats(self, raw_request: str):
+        """Return Middle routing counters as JSON"""
+        yield json.dumps(
+            {
+                "local_decisions": self.local_decisions,
+                "rpc_decisions": self.rpc_decisions,
+                "cancelled_streams": self.cancelled_streams,
+                "expired_requests": self.expired_requests,
+                "routing_table_version": self.routing_table.version
+                if self.routing_table
+                else None,
+                "validated_chunks": self.validated_chunks,
+                "invalid_chunks": self.invalid_chunks,
+                "cache": self.cache.stats() if self.cache else None,
+                "hedging": self.hedger.stats() if self.hedger else None,
+                "startup": timeline.as_dicts(),
+            }
+        )
 
     @endpoint()
     async def process(self, raw_request: str):
         """Process text through the pipeline with routing."""
-        request = TextRequest.model_validate_json(raw_request)
+        first_request("Middle")
+        request = self.request_codec.decode(raw_request)
         logger.info(f"Middle processing request: {request.request_id}")
 
-        async for response in self._process_with_routing(request):
-            yield response.model_dump_json()
+        if expired(request.deadline):
+            # The client has given up; skip routing and Backend work
+            self.expired_requests += 1
+            logger.info(f"Dropping expired request {request.request_id}")
+            raise DeadlineExceeded(
+                f"Request {request.request_id} expired before Middle"
+            )
+
+        if self.cache is None:
+            async with aclosing(self._relay(request)) as responses:
+                async for raw_response in responses:
+                    yield raw_response
+            return
+
+        greeting = request.greeting if request.greeting is not None else self.greeting
+        key = (self.cache_namespace, request.text, greeting)
+        cached = self.cache.get(key)
+        if cached is None:
+            async with aclosing(
+                self.cache.record(key, self._relay(request))
+            ) as responses:
+                async for raw_response in responses:
+                    yield raw_response
+        else:
+            # Cached chunks carry the request_id of the request that filled the entry
+            async for raw_response in cached.replay(paced=self.cache_replay == "paced"):
+                yield self._with_request_id(raw_response, request.request_id)
+
+    async def _relay(self, request: TextRequest):
+        async with aclosing(self._process_with_routing(request)) as responses:
+            async for raw_response in responses:
+                if self.relay_mode == "passthrough":
+                    # Forward backend bytes untouched
+                    self._sample_validate(raw_response)
+                    yield raw_response
+                else:
+                    yield self.response_codec.encode(
+                        self.response_codec.decode(raw_response)
+                    )
+
+    def _with_request_id(self, raw_response, request_id: str):
+        codec = self.response_codec
+        return codec.encode(
+            codec.replace(codec.decode(raw_response), request_id=request_id)
+        )
@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import concurrent.futures
+import importlib
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def load_function(path: str) -> Callable:
+    """Import a function from a "package.module:function" path"""
+    module_name, _, function_name = path.partition(":")
+    if not function_name:
+        raise ValueError(f"Expected 'module:function', got '{path}'")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def apply_batch(fn: Callable, items: Sequence[tuple]) -> List[Any]:
+    """Apply fn to each argument tuple; module level so process pools can pickle it"""
+    return [fn(*args) for args in items]
+
+
+class ComputeOffload:
+    """Runs processing functions inline, on a thread pool or on a process pool.
+
+    ``inline`` calls the function on the event loop. ``thread`` and
+    ``process`` run it on a pool of ``pool_size`` workers (defaults to the
+    executor's own default) so CPU-heavy work does not stall other streams.
+    Functions sent to a process pool must be importable at module level.
+    """
+
+    MODES = ("inline", "thread", "process")
+
+    def __init__(self, mode: str = "inline", pool_size: Optional[int] = None):
+        if mode not in self.MODES:
+            logger.warning(f"Unknown executor '{mode}', defaulting to 'inline'")
+            mode = "inline"
+        self.mode = mode
+        self.pool_size = pool_size
+        self.executor: Optional[Executor] = None
+        if mode == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        elif mode == "process":
+            # Resolved on use so multiprocessing is only imported when needed
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=pool_size
+            )
+
+    async def run(self, fn: Callable, *args) -> Any:
+        if self.executor is None:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def run_batch(self, fn: Callable, items: Sequence[tuple]) -> List[Any]:
+        """Apply fn to a batch of argument tuples in one executor call"""
+        return await self.run(apply_batch, fn, items)
+
+    def shutdown(self, wait: bool = False):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup profiling for service components.
+
+Set ``DYNAMO_STARTUP_PROFILE=1`` to enable. Importing the ``components``
+package then installs an import timer, and each component logs, once it is
+ready to serve:
+
+- import time per module (cumulative and self), for imports after the
+  ``components`` package was first loaded
+- ``__init__`` and ``@async_on_start`` duration per service, from the
+  startup timeline
+- time from process start until the component was ready, and until its
+  first request
+
+Imports made before ``components`` (such as ``dynamo.sdk`` by the serve
+command itself) are not seen; use ``python -X importtime`` for those.
+"""
+
+import functools
+import importlib.machinery
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from components.readiness import timeline
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "DYNAMO_STARTUP_PROFILE"
+
+
+def _process_start() -> float:
+    """Process start on the time.monotonic() clock, or now if unknown"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        return time.monotonic() - max(age, 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.monotonic()
+
+
+PROCESS_START = _process_start()
+
+# Loaders that are created per module, so wrapping one affects only that module
+_TIMED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class ImportTimer:
+    """Meta path hook that times the execution of each module imported after install.
+
+    Only per-module loaders (source, bytecode and extension files) are timed;
+    builtin and frozen modules load in microseconds.
+    """
+
+    def __init__(self):
+        self.times: Dict[str, List[float]] = {}  # name -> [cumulative, self]
+        self._stack: List[List[float]] = []
+        self._finding = False
+
+    def find_spec(self, name, path=None, target=None):
+        if self._finding:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+        if not isinstance(spec.loader, _TIMED_LOADERS):
+            return spec
+        spec.loader.exec_module = self._timed(name, spec.loader.exec_module)
+        return spec
+
+    def _timed(self, name: str, exec_module):
+        @functools.wraps(exec_module)
+        def wrapper(module):
+            frame = [0.0]  # time spent in nested imports
+            self._stack.append(frame)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1][0] += elapsed
+                self.times[name] = [elapsed, elapsed - frame[0]]
+
+        return wrapper
+
+    def top(self, n: int = 15) -> List[Tuple[str, float, float]]:
+        """Slowest imports as (module, cumulative_s, self_s)"""
+        ranked = sorted(self.times.items(), key=lambda item: item[1][0], reverse=True)
+        return [(name, cum, own) for name, (cum, own) in ranked[:n]]
+
+
+_timer: Optional[ImportTimer] = None
+_first_requests: set = set()
+
+
+def enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def install() -> Optional[ImportTimer]:
+    """Start timing imports; safe to call more than once"""
+    global _timer
+    if _timer is None:
+        _timer = ImportTimer()
+        sys.meta_path.insert(0, _timer)
+    return _timer
+
+
+def timed_init(cls):
+    """Class decorator recording each instance's __init__ in the startup timeline"""
+    init = cls.__init__
+
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        with timeline.span(cls.__name__, "__init__"):
+            init(self, *args, **kwargs)
+
+    cls.__init__ = __init__
+    return cls
+
+
+def startup_complete(component: str):
+    """Mark a component ready to serve and, when profiling, log its startup profile"""
+    entry = timeline.mark(component, "ready")
+    if not enabled():
+        return
+    timeline.log(component)
+    ready_after = timeline.origin + entry.started_at - PROCESS_START
+    logger.info(f"Startup {component}: ready {ready_after:.3f}s after process start")
+    if _timer is not None:
+        for name, cumulative, own in _timer.top():
+            logger.info(
+                f"Startup import {name}: {cumulative * 1000:.1f}ms (self {own * 1000:.1f}ms)"
+            )
+
+
+def first_request(component: str):
+    """Record when a component starts its first request"""
+    if component in _first_requests:
+        return
+    _first_requests.add(component)
+    entry = timeline.mark(component, "first_request")
+    if not enabled():
+        return
+    logger.info(
+        f"Startup {component}: first request "
+        f"{timeline.origin + entry.started_at - PROCESS_START:.3f}s after process start"
+    )
@@ -0,0 +1,497 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import msgspec
+from components.utils import QueueTask
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a bounded queue has no room for a task"""
+
+
+class TaskQueue:
+    """Interface shared by the task queue backends (matches NatsQueue)"""
+
+    async def connect(self):
+        pass
+
+    async def enqueue_task(self, data: bytes):
+        raise NotImplementedError
+
+    async def dequeue_task(self) -> Optional[bytes]:
+        """Return the next task, or None after dequeue_timeout with no task"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InProcessQueue(TaskQueue):
+    """asyncio queue for components served from the same process.
+
+    Queues are shared by ``stream_name``, so a Backend and a QueueWorker in
+    one process exchange tasks without any broker.
+    """
+
+    _streams: Dict[str, asyncio.Queue] = {}
+
+    def __init__(
+        self, stream_name: str, dequeue_timeout: float = 1.0, max_size: int = 0
+    ):
+        self.stream_name = stream_name
+        self.dequeue_timeout = dequeue_timeout
+        self.max_size = max_size
+        self.queue: Optional[asyncio.Queue] = None
+
+    async def connect(self):
+        self.queue = self._streams.setdefault(
+            self.stream_name, asyncio.Queue(self.max_size)
+        )
+
+    async def enqueue_task(self, data: bytes):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            raise QueueFullError(self.stream_name)
+
+    def try_dequeue(self) -> Optional[bytes]:
+        return None if self.queue.empty() else self.queue.get_nowait()
+
+    async def dequeue_task(self) -> Optional[bytes]:
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), self.dequeue_timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ShmRingQueue(TaskQueue):
+    """Cross-process ring buffer in a memory-mapped file for same-node components.
+
+    Records are length-prefixed and may wrap around the end of the data
+    region. Producers and consumers in different processes serialize on an
+    flock of the file, so every critical section is a short memory copy.
+    There is no cross-process wakeup: an empty dequeue polls every
+    ``poll_interval`` seconds until ``dequeue_timeout``.
+    """
+
+    MAGIC = b"DYNRING1"
+    HEADER = struct.Struct("<8sQQQ")  # magic, capacity, head, tail
+    LENGTH = struct.Struct("<I")
+
+    def __init__(
+        self,
+        stream_name: str,
+        path: Optional[str] = None,
+        capacity: int = 16 * 1024 * 1024,
+        dequeue_timeout: float = 1.0,
+        poll_interval: float = 0.001,
+    ):
+        self.path = path or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp", f"{stream_name}.ring"
+        )
+        self.capacity = capacity
+        self.dequeue_timeout = dequeue_timeout
+        self.poll_interval = poll_interval
+        self.file = None
+        self.map: Optional[mmap.mmap] = None
+
+    async def connect(self):
+        self.file = open(self.path, "a+b")
+        with self._locked():
+            self.file.seek(0, os.SEEK_END)
+            if self.file.tell() == 0:
+                self.file.truncate(self.HEADER.size + self.capacity)
+                self.map = mmap.mmap(self.file.fileno(), 0)
+                self.HEADER.pack_into(self.map, 0, self.MAGIC, self.capacity, 0, 0)
+            else:
+                self.map = mmap.mmap(self.file.fileno(), 0)
+                magic, self.capacity, _, _ = self.HEADER.unpack_from(self.map, 0)
+                if magic != self.MAGIC:
+                    raise ValueError(f"{self.path} is not a task ring buffer")
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+    def _write(self, position: int, data: bytes):
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        base = self.HEADER.size
+        self.map[base + offset : base + offset + first] = data[:first]
+        if first < len(data):
+            self.map[base : base + len(data) - first] = data[first:]
+
+    def _read(self, position: int, size: int) -> bytes:
+        offset = position % self.capacity
+        first = min(size, self.capacity - offset)
+        base = self.HEADER.size
+        data = self.map[base + offset : base + offset + first]
+        if first < size:
+            data += self.map[base : base + size - first]
+        return data
+
+    def try_enqueue(self, data: bytes):
+        record = self.LENGTH.pack(len(data)) + data
+        with self._locked():
+            magic, capacity, head, tail = self.HEADER.unpack_from(self.map, 0)
+            if capacity - (tail - head) < len(record):
+                raise QueueFullError(self.path)
+            self._write(tail, record)
+            self.HEADER.pack_into(
+                self.map, 0, magic, capacity, head, tail + len(record)
+            )
+
+    def try_dequeue(self) -> Optional[bytes]:
+        with self._locked():
+            magic, capacity, head, tail = self.HEADER.unpack_from(self.map, 0)
+            if head == tail:
+                return None
+            (size,) = self.LENGTH.unpack(self._read(head, self.LENGTH.size))
+            data = self._read(head + self.LENGTH.size, size)
+            self.HEADER.pack_into(
+                self.map, 0, magic, capacity, head + self.LENGTH.size + size, tail
+            )
+            return data
+
+    async def enqueue_task(self, data: bytes):
+        self.try_enqueue(data)
+
+    async def dequeue_task(self) -> Optional[bytes]:
+        deadline = time.monotonic() + self.dequeue_timeout
+        while True:
+            data = self.try_dequeue()
+            if data is not None or time.monotonic() >= deadline:
+                return data
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+QUEUE_BACKENDS = ("nats", "inprocess", "shm")
+
+
+def make_queue(
+    backend: str,
+    stream_name: str,
+    dequeue_timeout: float = 1.0,
+    nats_server: str = "nats://localhost:4222",
+    shm_path: Optional[str] = None,
+    shm_capacity: int = 16 * 1024 * 1024,
+):
+    """Create a task queue for a queue_backend config value"""
+    if backend not in QUEUE_BACKENDS:
+        logger.warning(f"Unknown queue_backend '{backend}', defaulting to 'nats'")
+        backend = "nats"
+    if backend == "inprocess":
+        return InProcessQueue(stream_name, dequeue_timeout=dequeue_timeout)
+    if backend == "shm":
+        return ShmRingQueue(
+            stream_name,
+            path=shm_path,
+            capacity=shm_capacity,
+            dequeue_timeout=dequeue_timeout,
+        )
+    # Imported here so the other backends work without the Dynamo runtime
+    from dynamo._core import NatsQueue
+
+    return NatsQueue(
+        stream_name=stream_name,
+        nats_server=nats_server,
+        dequeue_timeout=dequeue_timeout,
+    )
+
+
+class QueueConsumer:
+    """Prefetching, concurrent consumer for a task queue.
+
+    Pulls up to ``prefetch`` tasks ahead of processing, decodes each pulled
+    batch in one pass with a reused decoder, and runs ``handler`` on up to
+    ``concurrency`` tasks at once. Only the first dequeue of a batch waits
+    for a task; the rest are drained without blocking (on backends that
+    offer ``try_dequeue``), so a lone task is dispatched as soon as it
+    arrives. An empty dequeue has already waited ``dequeue_timeout`` and
+    is retried straight away; failing dequeues back off exponentially from
+    ``min_backoff`` to ``max_backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        queue,
+        handler: Callable[[QueueTask], Awaitable[None]],
+        prefetch: int = 16,
+        concurrency: int = 8,
+        min_backoff: float = 0.01,
+        max_backoff: float = 1.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.prefetch = max(1, prefetch)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.decoder = msgspec.json.Decoder(QueueTask)
+        self.running = True
+        self.dequeued = 0
+        self.processed = 0
+        self.failed = 0
+        self.inflight = 0
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._slot_freed = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._started_at = time.monotonic()
+
+    @property
+    def backlog(self) -> int:
+        """Tasks pulled from the queue but not finished yet"""
+        return self.inflight
+
+    async def _fetch(self, limit: int) -> List[bytes]:
+        """Wait for one task, then drain up to limit without blocking"""
+        data = await self.queue.dequeue_task()
+        if not data:
+            return []
+        batch = [data]
+        try_dequeue = getattr(self.queue, "try_dequeue", None)
+        while try_dequeue is not None and len(batch) < limit:
+            data = try_dequeue()
+            if not data:
+                break
+            batch.append(data)
+        return batch
+
+    def _decode(self, batch: List[bytes]) -> List[QueueTask]:
+        try:
+            return self.decoder.decode_lines(b"\n".join(batch))
+        except msgspec.DecodeError:
+            # Decode one by one so a single bad task does not drop the batch
+            tasks = []
+            for data in batch:
+                try:
+                    tasks.append(self.decoder.decode(data))
+                except msgspec.DecodeError as e:
+                    self.failed += 1
+                    logger.error(f"Dropping undecodable queue task: {e}")
+            return tasks
+
+    async def _handle(self, task: QueueTask):
+        try:
+            async with self._semaphore:
+                await self.handler(task)
+            self.processed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error processing queue task {task.request_id}: {e}")
+        finally:
+            self.inflight -= 1
+            self._slot_freed.set()
+
+    async def run(self):
+        """Consume until stop() is called"""
+        backoff = self.min_backoff
+        while self.running:
+            free = self.prefetch - self.inflight
+            if free <= 0:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+            try:
+                batch = await self._fetch(free)
+            except Exception as e:
+                logger.error(f"Error dequeuing tasks: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = self.min_backoff
+            if not batch:
+                continue
+
+            self.dequeued += len(batch)
+            for task in self._decode(batch):
+                self.inflight += 1
+                handle = asyncio.create_task(self._handle(task))
+                self._tasks.add(handle)
+                handle.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        """Stop pulling new tasks and wait for the ones in progress"""
+        self.running = False
+        self._slot_freed.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "dequeued": self.dequeued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "backlog": self.backlog,
+            "dequeue_rate": self.dequeued / elapsed,
+            "processing_rate": self.processed / elapsed,
+        }
+
+
+class BackgroundEnqueuer:
+    """Buffers outgoing tasks locally and enqueues them off the request path.
+
+    ``submit()`` never waits: it appends to a buffer of at most
+    ``max_buffer`` tasks, dropping the oldest buffered task when full. A
+    background loop flushes a batch when ``batch_size`` tasks are buffered
+    or ``flush_interval`` seconds have passed. Failed sends are put back
+    for up to ``max_retries`` further attempts before being dropped.
+    """
+
+    def __init__(
+        self,
+        queue,
+        max_buffer: int = 1024,
+        batch_size: int = 32,
+        flush_interval: float = 0.05,
+        max_retries: int = 3,
+    ):
+        self.queue = queue
+        self.max_buffer = max(1, max_buffer)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.buffer: deque = deque()  # (attempt, data)
+        self.enqueued = 0
+        self.dropped = 0
+        self.retried = 0
+        self._batch_ready = asyncio.Event()
+        self._task = None
+        self._closed = False
+
+    def submit(self, data: bytes) -> bool:
+        """Buffer a task for sending; returns False if an older task was dropped"""
+        if self._closed:
+            self.dropped += 1
+            return False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        accepted = True
+        if len(self.buffer) >= self.max_buffer:
+            self.buffer.popleft()
+            self.dropped += 1
+            accepted = False
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(
+                    f"Enqueue buffer full, dropped oldest task ({self.dropped} dropped so far)"
+                )
+        self.buffer.append((0, data))
+        if len(self.buffer) >= self.batch_size:
+            self._batch_ready.set()
+        return accepted
+
+    async def _send(self, attempt: int, data: bytes) -> bool:
+        try:
+            await self.queue.enqueue_task(data)
+            self.enqueued += 1
+            return True
+        except Exception as e:
+            if attempt >= self.max_retries or len(self.buffer) >= self.max_buffer:
+                self.dropped += 1
+                logger.error(f"Dropping task after {attempt + 1} enqueue attempts: {e}")
+            else:
+                self.retried += 1
+                self.buffer.append((attempt + 1, data))
+            return False
+
+    async def flush(self):
+        """Send the tasks buffered when the flush starts, in batches
+
+        Failed sends go back to the end of the buffer and wait for the next
+        flush, so retries are spaced by ``flush_interval`` instead of
+        spending the retry budget in a tight loop.
+        """
+        remaining = len(self.buffer)
+        while remaining > 0 and self.buffer:
+            batch = [
+                self.buffer.popleft()
+                for _ in range(min(self.batch_size, remaining, len(self.buffer)))
+            ]
+            remaining -= len(batch)
+            results = await asyncio.gather(
+                *(self._send(attempt, data) for attempt, data in batch)
+            )
+            if not any(results):
+                # Whole batch failed; let the loop retry after a pause
+                break
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stop the background loop, then flush remaining tasks (retrying failures)
+
+        The loop is woken and awaited rather than cancelled, so a batch it
+        is sending is never lost mid-flight. Whatever still cannot be sent
+        after the final retries is counted as dropped.
+        """
+        self._closed = True
+        if self._task is not None:
+            self._batch_ready.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Enqueue loop failed: {e}")
+        for attempt in range(self.max_retries + 1):
+            if not self.buffer:
+                break
+            if attempt:
+                await asyncio.sleep(self.flush_interval)
+            await self.flush()
+        if self.buffer:
+            self.dropped += len(self.buffer)
+            logger.error(f"Dropping {len(self.buffer)} buffered tasks on close")
+            self.buffer.clear()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "retried": self.retried,
+        }
@@ -0,0 +1 @@
+../../common/readiness.py
\ No newline at end of file
@@ -0,0 +1,235 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import mmap
+import os
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_size(chunk: Any) -> int:
+    """Bytes a chunk accounts for in the cache budget"""
+    if isinstance(chunk, (str, bytes)):
+        return len(chunk)
+    return len(msgspec.msgpack.encode(chunk))
+
+
+@dataclass
+class CachedStream:
+    """A complete streamed response: chunks plus when each arrived"""
+
+    chunks: List[Any] = field(default_factory=list)
+    offsets: List[float] = field(default_factory=list)  # seconds since the stream began
+    size: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+    def add(self, chunk: Any, offset: float):
+        self.chunks.append(chunk)
+        self.offsets.append(offset)
+        self.size += chunk_size(chunk)
+
+    async def replay(self, paced: bool = False) -> AsyncIterator:
+        """Yield the chunks immediately or at their original pacing"""
+        start = time.monotonic()
+        for chunk, offset in zip(self.chunks, self.offsets):
+            if paced:
+                delay = offset - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield chunk
+
+
+class MmapStreamStore:
+    """Second cache tier: streams evicted from memory, kept in an mmap ring log.
+
+    Records are written one after another and wrap to the start of the file
+    when they reach the end, overwriting the oldest records. The index lives
+    in memory, so the file is scratch space and is reset when opened. Only
+    streams of str or bytes chunks can be stored.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, capacity)
+            self.mm = mmap.mmap(fd, capacity)
+        finally:
+            os.close(fd)
+        # key -> (offset, length, created_at), in write order
+        self.index: "OrderedDict[Hashable, Tuple[int, int, float]]" = OrderedDict()
+        self.write_pos = 0
+        self.encoder = msgspec.msgpack.Encoder()
+        self.decoder = msgspec.msgpack.Decoder(Tuple[List[float], List[Any]])
+
+    def _drop_front_while(self, predicate) -> int:
+        dropped = 0
+        while self.index:
+            key, (offset, length, _) = next(iter(self.index.items()))
+            if not predicate(offset, length):
+                break
+            del self.index[key]
+            dropped += 1
+        return dropped
+
+    def put(self, key: Hashable, stream: CachedStream) -> int:
+        """Store a stream; returns how many older records were overwritten"""
+        if not all(isinstance(chunk, (str, bytes)) for chunk in stream.chunks):
+            return 0
+        data = self.encoder.encode((stream.offsets, stream.chunks))
+        if len(data) > self.capacity:
+            return 0
+        self.index.pop(key, None)
+        dropped = 0
+        if self.write_pos + len(data) > self.capacity:
+            # Records past the write position are the oldest; lose them and wrap
+            old_pos = self.write_pos
+            dropped += self._drop_front_while(lambda offset, length: offset >= old_pos)
+            self.write_pos = 0
+        end = self.write_pos + len(data)
+        start = self.write_pos
+        dropped += self._drop_front_while(
+            lambda offset, length: offset < end and offset + length > start
+        )
+        self.mm[start:end] = data
+        self.index[key] = (start, len(data), stream.created_at)
+        self.write_pos = end
+        return dropped
+
+    def pop(self, key: Hashable) -> Optional[CachedStream]:
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return None
+        offset, length, created_at = entry
+        offsets, chunks = self.decoder.decode(self.mm[offset : offset + length])
+        stream = CachedStream(created_at=created_at)
+        for chunk, chunk_offset in zip(chunks, offsets):
+            stream.add(chunk, chunk_offset)
+        return stream
+
+    def close(self):
+        self.mm.close()
+
+
+class ResponseCache:
+    """LRU cache of complete streamed responses with a byte budget and TTL.
+
+    Streams evicted from memory move to an optional ``MmapStreamStore`` and
+    are promoted back on their next hit. Entries older than ``ttl`` seconds
+    are never served.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300.0,
+        disk_path: Optional[str] = None,
+        disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, CachedStream]" = OrderedDict()
+        self.bytes = 0
+        self.disk = MmapStreamStore(disk_path, disk_bytes) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_evictions = 0
+
+    def _expired(self, stream: CachedStream) -> bool:
+        return self.ttl > 0 and time.monotonic() - stream.created_at > self.ttl
+
+    def get(self, key: Hashable) -> Optional[CachedStream]:
+        stream = self.entries.get(key)
+        if stream is not None:
+            if self._expired(stream):
+                self._remove(key)
+                self.expirations += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return stream
+        elif self.disk is not None:
+            stream = self.disk.pop(key)
+            if stream is not None:
+                if self._expired(stream):
+                    self.expirations += 1
+                else:
+                    self.disk_hits += 1
+                    self._insert(key, stream)
+                    return stream
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, stream: CachedStream):
+        if stream.size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self._insert(key, stream)
+
+    def _insert(self, key: Hashable, stream: CachedStream):
+        self.entries[key] = stream
+        self.bytes += stream.size
+        while self.bytes > self.max_bytes:
+            old_key, old_stream = self.entries.popitem(last=False)
+            self.bytes -= old_stream.size
+            self.evictions += 1
+            if self.disk is not None and not self._expired(old_stream):
+                self.disk_evictions += self.disk.put(old_key, old_stream)
+
+    def _remove(self, key: Hashable):
+        self.bytes -= self.entries.pop(key).size
+
+    async def record(self, key: Hashable, source: AsyncIterator) -> AsyncIterator:
+        """Pass a stream through, caching it only if it completes"""
+        stream = CachedStream()
+        start = time.monotonic()
+        async with aclosing(source) as chunks:
+            async for chunk in chunks:
+                stream.add(chunk, time.monotonic() - start)
+                yield chunk
+        self.put(key, stream)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "disk_evictions": self.disk_evictions,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "disk_entries": len(self.disk.index) if self.disk else 0,
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
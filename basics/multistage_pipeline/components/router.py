@@ -13,14 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import logging
-from typing import Dict
 import asyncio
-
-from dynamo.sdk import endpoint, service, dynamo_context, async_on_start
-from dynamo.runtime import Client
+import json
+import logging
+from typing import Optional, Sequence
 
 from components.backend import Backend
+from components.deadlines import expired
+from components.profiling import startup_complete, timed_init
+from components.readiness import timeline
+from components.routing import (
+    MembershipWatcher,
+    WorkerLoadTracker,
+    diff_loads,
+    make_policy,
+)
+from components.utils import LoadUpdate, RouteRequest, WorkerReport, split_words
+
+from dynamo.runtime import Client
+from dynamo.sdk import async_on_start, dynamo_context, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
 
 logger = logging.getLogger(__name__)
 
@@ -28,72 +40,194 @@ logger = logging.getLogger(__name__)
 @service(
     dynamo={"namespace": "multistage"},
 )
+@timed_init
 class Router:
     """Router service that uses workload-based routing to distribute requests."""
 
     backend_client: Client
-    worker_loads: Dict[int, int]
+    tracker: WorkerLoadTracker
+    membership: MembershipWatcher
 
     def __init__(self):
-        self.worker_loads = {}
-        logger.info("Router initialized with workload-based routing")
+        config = ServiceConfig.get_instance()
+        router_config = config.get("Router", {})
+        self.tracker = WorkerLoadTracker(
+            remaining_work_weight=router_config.get("remaining_work_weight", 0.1),
+            lease_timeout=router_config.get("lease_timeout", 300),
+            policy=make_policy(
+                router_config.get("selection_policy", "least_loaded"),
+                **router_config.get("policy_options", {}),
+            ),
+        )
+        self.membership_poll_interval = router_config.get(
+            "membership_poll_interval", 1.0
+        )
+        self.suspect_timeout = router_config.get("suspect_timeout", 5.0)
+        self.snapshot_interval = router_config.get("snapshot_interval", 0.05)
+        self.full_snapshot_every = max(1, router_config.get("full_snapshot_every", 100))
+        self.decisions = 0
+        self.stale_decisions = 0
+        self.expired_requests = 0
+        logger.info(
+            f"Router initialized with {type(self.tracker.policy).__name__} selection"
+        )
 
     @async_on_start
     async def async_init(self):
-        runtime = dynamo_context["runtime"]
-        backend_ns, backend_name = Backend.dynamo_address()
-        self.backend_client = (
-            await runtime.namespace(backend_ns)
-            .component(backend_name)
-            .endpoint("process_text")
-            .client()
-        )
-
-        # Start worker monitoring
-        asyncio.create_task(self._monitor_workers())
+        async with timeline.phase("Router", "async_init"):
+            runtime = dynamo_context["runtime"]
+            backend_ns, backend_name = Backend.dynamo_address()
+            self.backend_client = (
+                await runtime.namespace(backend_ns)
+                .component(backend_name)
+                .endpoint("process_text")
+                .client()
+            )
+
+            # Apply membership changes as they are observed
+            self.membership = MembershipWatcher(
+                self.backend_client,
+                poll_interval=self.membership_poll_interval,
+                suspect_timeout=self.suspect_timeout,
+            )
+            self.membership.refresh()
+            for worker_id in self.membership.members:
+                self.tracker.add_worker(worker_id)
+            asyncio.create_task(self._watch_workers())
+            asyncio.create_task(self._monitor_workers())
+        startup_complete("Router")
+
+    async def _watch_workers(self):
+        """Update the routing index on every worker join or leave"""
+        async for kind, worker_id in self.membership.events():
+            if kind == "join":
+                self.tracker.add_worker(worker_id)
+                logger.info(f"Worker {worker_id} joined")
+            else:
+                dropped = self.tracker.remove_worker(worker_id)
+                # Requests sent after the worker left but before we noticed
+                self.stale_decisions += sum(1 for lease in dropped if not lease.started)
+                logger.info(f"Worker {worker_id} left with {len(dropped)} open streams")
 
     async def _monitor_workers(self):
-        """Monitor worker availability and reset loads periodically"""
+        """Expire leases that were never released and log loads periodically"""
         while True:
             try:
-                worker_ids = self.backend_client.instance_ids()
-
-                # Initialize new workers with zero load
-                for worker_id in worker_ids:
-                    if worker_id not in self.worker_loads:
-                        self.worker_loads[worker_id] = 0
-
-                # Remove stale workers
-                stale_workers = [wid for wid in self.worker_loads if wid not in worker_ids]
-                for wid in stale_workers:
-                    del self.worker_loads[wid]
-
-                logger.info(f"Active workers: {worker_ids}, loads: {self.worker_loads}")
-
+                self.tracker.expire()
+                logger.info(
+                    f"Active workers: {self.tracker.workers()}, loads: {self.tracker.loads()}"
+                )
             except Exception as e:
                 logger.error(f"Error monitoring workers: {e}")
 
-            await asyncio.sleep(10)  # Check every 10 seconds
-
-    def _get_best_worker_by_load(self) -> tuple[int, float]:
-        """Select worker with lowest current load"""
-        if not self.worker_loads:
+            await asyncio.sleep(10)
+
+    def _get_best_worker_by_load(
+        self, text: Optional[str] = None, exclude: Sequence[int] = ()
+    ) -> tuple[int, float]:
+        """Select worker through the configured selection policy"""
+        worker_id = self.tracker.select(text)
+        if worker_id in exclude:
+            # Rare (hedged requests), so a scan is fine
+            candidates = {
+                w: load for w, load in self.tracker.loads().items() if w not in exclude
+            }
+            worker_id = min(candidates, key=candidates.get) if candidates else None
+        if worker_id is None:
             return -1, 0.0
-
-        # Find worker with minimum load
-        best_worker = min(self.worker_loads.items(), key=lambda x: x[1])
-        return best_worker[0], 1.0
+        return worker_id, self.tracker.load(worker_id)
 
     @endpoint()
-    async def get_best_worker(self, text: str) -> str:
+    async def get_best_worker(self, raw_request: str) -> str:
         """Return best worker ID based on current workload"""
-        worker_id, score = self._get_best_worker_by_load()
-
+        request = RouteRequest.model_validate_json(raw_request)
+        if expired(request.deadline):
+            # No lease: the request will not be sent anywhere
+            self.expired_requests += 1
+            yield "expired:0.0"
+            return
+        worker_id, score = self._get_best_worker_by_load(request.text, request.exclude)
+
+        self.decisions += 1
         if worker_id >= 0:
-            # Increment load for selected worker
-            self.worker_loads[worker_id] += 1
-            logger.info(f"Router selected worker {worker_id} (load: {self.worker_loads[worker_id]}) for text: {text[:30]}...")
+            # Reserve capacity until Middle reports the stream finished
+            self.tracker.acquire(
+                request.lease_id, worker_id, len(split_words(request.text))
+            )
+            load = self.tracker.load(worker_id)
+            logger.info(
+                f"Router selected worker {worker_id} (load: {load:.2f}) "
+                f"for text: {request.text[:30]}..."
+            )
             yield f"{worker_id}:{score}"
         else:
             logger.warning("No workers available")
             yield "none:0.0"
+
+    @endpoint()
+    async def report(self, raw_report: str):
+        """Apply a stream lifecycle report from Middle to the load tracker"""
+        report = WorkerReport.model_validate_json(raw_report)
+        if report.event == "start":
+            self.tracker.start(report.lease_id, report.worker_id, report.total_units)
+        elif report.event == "progress":
+            self.tracker.progress(report.lease_id, report.completed_units)
+        elif report.event in ("end", "error", "cancelled", "unreachable"):
+            lease = self.tracker.release(report.lease_id)
+            if lease is not None and report.event != "end":
+                logger.info(
+                    f"Stream on worker {report.worker_id} ended with {report.event}"
+                )
+            if report.event == "unreachable":
+                # The stream could not even be opened: treat the worker as gone. Request
+                # errors ("error") leave it in place, so bad input cannot drain the pool
+                self.stale_decisions += 1
+                self.membership.suspect(report.worker_id)
+        else:
+            logger.warning(f"Unknown report event: {report.event}")
+        yield "ok"
+
+    @endpoint()
+    async def watch_loads(self, raw_request: str):
+        """Push worker load snapshots and deltas to a Middle replica.
+
+        An update with no loads and an unchanged version is a heartbeat
+        telling the subscriber its view is still current.
+        """
+        version = 0
+        previous = self.tracker.loads()
+        yield LoadUpdate(version=version, full=True, loads=previous).model_dump_json()
+        ticks = 0
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            ticks += 1
+            current = self.tracker.loads()
+            if ticks % self.full_snapshot_every == 0:
+                version += 1
+                update = LoadUpdate(version=version, full=True, loads=current)
+            else:
+                changed, removed = diff_loads(previous, current)
+                if changed or removed:
+                    version += 1
+                update = LoadUpdate(version=version, loads=changed, removed=removed)
+            previous = current
+            yield update.model_dump_json()
+
+    @endpoint()
+    async def stats(self, raw_request: str):
+        """Return routing and membership counters as JSON"""
+        yield json.dumps(
+            {
+                "workers": sorted(self.tracker.workers()),
+                "loads": self.tracker.loads(),
+                "decisions": self.decisions,
+                "stale_decisions": self.stale_decisions,
+                "expired_requests": self.expired_requests,
+                "joins": self.membership.joins,
+                "leaves": self.membership.leaves,
+                "suspects": sorted(self.membership.suspects),
+                "policy": self.tracker.policy.stats()
+                if hasattr(self.tracker.policy, "stats")
+                else None,
+            }
+        )
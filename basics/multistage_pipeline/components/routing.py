@@ -0,0 +1,562 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SelectionPolicy:
+    """Chooses a worker given load updates pushed by the WorkerLoadTracker"""
+
+    # Whether select() depends on the request key
+    uses_key = False
+
+    def update(self, worker_id: int, load: float):
+        raise NotImplementedError
+
+    def remove(self, worker_id: int):
+        raise NotImplementedError
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        """Pick a worker; ``key`` is the request text, used by affinity policies"""
+        raise NotImplementedError
+
+
+class ScanPolicy(SelectionPolicy):
+    """Full scan for the minimum load on every decision, O(n)"""
+
+    def __init__(self):
+        self.loads: Dict[int, float] = {}
+
+    def update(self, worker_id: int, load: float):
+        self.loads[worker_id] = load
+
+    def remove(self, worker_id: int):
+        self.loads.pop(worker_id, None)
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        if not self.loads:
+            return None
+        return min(self.loads.items(), key=lambda x: x[1])[0]
+
+
+class LeastLoadedPolicy(SelectionPolicy):
+    """Indexed binary min-heap: O(log n) updates and O(1) least-loaded lookup"""
+
+    def __init__(self):
+        self.heap: List[List] = []  # [load, worker_id]
+        self.position: Dict[int, int] = {}
+
+    def update(self, worker_id: int, load: float):
+        index = self.position.get(worker_id)
+        if index is None:
+            self.heap.append([load, worker_id])
+            index = len(self.heap) - 1
+            self.position[worker_id] = index
+            self._sift_up(index)
+            return
+        old = self.heap[index][0]
+        self.heap[index][0] = load
+        if load < old:
+            self._sift_up(index)
+        elif load > old:
+            self._sift_down(index)
+
+    def remove(self, worker_id: int):
+        index = self.position.pop(worker_id, None)
+        if index is None:
+            return
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.position[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self.position[last[1]])
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        return self.heap[0][1] if self.heap else None
+
+    def _swap(self, i: int, j: int):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i][1]] = i
+        self.position[heap[j][1]] = j
+
+    def _sift_up(self, index: int):
+        heap = self.heap
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[index][0] >= heap[parent][0]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index: int):
+        heap = self.heap
+        size = len(heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+
+class PowerOfTwoPolicy(SelectionPolicy):
+    """Samples two random workers and picks the less loaded one, O(1).
+
+    Unlike a strict minimum, concurrent decisions made from the same load
+    view spread over several workers instead of all landing on one.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.loads: Dict[int, float] = {}
+        self.workers: List[int] = []
+        self.index: Dict[int, int] = {}
+
+    def update(self, worker_id: int, load: float):
+        if worker_id not in self.loads:
+            self.index[worker_id] = len(self.workers)
+            self.workers.append(worker_id)
+        self.loads[worker_id] = load
+
+    def remove(self, worker_id: int):
+        if worker_id not in self.loads:
+            return
+        del self.loads[worker_id]
+        index = self.index.pop(worker_id)
+        last = self.workers.pop()
+        if index < len(self.workers):
+            self.workers[index] = last
+            self.index[last] = index
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        count = len(self.workers)
+        if count == 0:
+            return None
+        if count == 1:
+            return self.workers[0]
+        first, second = self.rng.sample(range(count), 2)
+        a, b = self.workers[first], self.workers[second]
+        return a if self.loads[a] <= self.loads[b] else b
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class ConsistentHashPolicy(SelectionPolicy):
+    """Consistent hashing with bounded loads, keyed on a prefix of the request text.
+
+    Requests sharing their first ``prefix_chars`` characters go to the same
+    worker, so per-worker caches keep getting hits. A worker is skipped while
+    its load is at or above ``load_factor`` times the mean load, and the
+    request spills to the next worker on the ring. Each worker owns
+    ``vnodes`` points on the ring, so a join or leave only moves the keys
+    next to that worker's points.
+    """
+
+    uses_key = True
+
+    def __init__(
+        self, prefix_chars: int = 32, load_factor: float = 1.25, vnodes: int = 100
+    ):
+        self.prefix_chars = prefix_chars
+        self.load_factor = max(load_factor, 1.0)
+        self.vnodes = vnodes
+        self.loads: Dict[int, float] = {}
+        self.total_load = 0.0
+        self.ring: List[Tuple[int, int]] = []  # (hash, worker_id), sorted
+        self.affinity = 0
+        self.spills = 0
+
+    def update(self, worker_id: int, load: float):
+        if worker_id not in self.loads:
+            for replica in range(self.vnodes):
+                bisect.insort(
+                    self.ring, (_ring_hash(f"{worker_id}#{replica}"), worker_id)
+                )
+            self.loads[worker_id] = 0.0
+        self.total_load += load - self.loads[worker_id]
+        self.loads[worker_id] = load
+
+    def remove(self, worker_id: int):
+        if worker_id not in self.loads:
+            return
+        self.total_load -= self.loads.pop(worker_id)
+        self.ring = [point for point in self.ring if point[1] != worker_id]
+
+    def bound(self) -> float:
+        """Load at which a worker stops taking new keys, counting the request being placed.
+
+        The least loaded worker is always below it, since it is below the mean.
+        """
+        return self.load_factor * (self.total_load + 1) / len(self.loads)
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        if not self.loads:
+            return None
+        if key is None:
+            return min(self.loads.items(), key=lambda x: x[1])[0]
+        bound = self.bound()
+        start = bisect.bisect(self.ring, (_ring_hash(key[: self.prefix_chars]), -1))
+        seen: Set[int] = set()
+        for step in range(len(self.ring)):
+            worker_id = self.ring[(start + step) % len(self.ring)][1]
+            if worker_id in seen:
+                continue
+            seen.add(worker_id)
+            if self.loads[worker_id] < bound:
+                if len(seen) == 1:
+                    self.affinity += 1
+                else:
+                    self.spills += 1
+                return worker_id
+            if len(seen) == len(self.loads):
+                break
+        self.spills += 1
+        return min(self.loads.items(), key=lambda x: x[1])[0]
+
+    def stats(self) -> dict:
+        return {"affinity": self.affinity, "spills": self.spills}
+
+
+SELECTION_POLICIES = {
+    "least_loaded": LeastLoadedPolicy,
+    "power_of_two": PowerOfTwoPolicy,
+    "scan": ScanPolicy,
+    "consistent_hash": ConsistentHashPolicy,
+}
+
+
+def make_policy(name: str, **options) -> SelectionPolicy:
+    """Create a selection policy by its config name.
+
+    ``options`` are passed to the policy's constructor; only
+    ``consistent_hash`` takes any.
+    """
+    if name not in SELECTION_POLICIES:
+        logger.warning(
+            f"Unknown selection_policy '{name}', defaulting to 'least_loaded'"
+        )
+        name = "least_loaded"
+    if name != "consistent_hash":
+        options = {}
+    return SELECTION_POLICIES[name](**options)
+
+
+@dataclass
+class Lease:
+    """An in-flight request assigned to a worker"""
+
+    worker_id: int
+    total_units: int
+    completed_units: int = 0
+    started: bool = False
+    updated_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def remaining_units(self) -> int:
+        return max(self.total_units - self.completed_units, 0)
+
+
+class WorkerLoadTracker:
+    """Tracks outstanding requests per worker from stream lifecycle reports.
+
+    A worker's load is its number of in-flight streams plus the work units
+    (words) those streams still have to produce, scaled by
+    ``remaining_work_weight``. Released lease ids are remembered for
+    ``released_ttl`` seconds so a late "start" report cannot reopen a lease
+    whose "end" already arrived.
+    """
+
+    def __init__(
+        self,
+        remaining_work_weight: float = 0.1,
+        lease_timeout: float = 300.0,
+        policy: Optional[SelectionPolicy] = None,
+        released_ttl: float = 60.0,
+    ):
+        self.remaining_work_weight = remaining_work_weight
+        self.lease_timeout = lease_timeout
+        self.policy = policy or LeastLoadedPolicy()
+        self.released_ttl = released_ttl
+        self.leases: Dict[str, Lease] = {}
+        self.released: OrderedDict[str, float] = OrderedDict()
+        self.inflight: Dict[int, int] = {}
+        self.remaining: Dict[int, int] = {}
+
+    def _changed(self, worker_id: int):
+        if worker_id in self.inflight:
+            self.policy.update(worker_id, self.load(worker_id))
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        """Pick a worker according to the configured selection policy"""
+        return self.policy.select(key)
+
+    def workers(self) -> List[int]:
+        return list(self.inflight)
+
+    def has_worker(self, worker_id: int) -> bool:
+        return worker_id in self.inflight
+
+    def add_worker(self, worker_id: int):
+        if worker_id not in self.inflight:
+            self.inflight[worker_id] = 0
+            self.remaining[worker_id] = 0
+            self.policy.update(worker_id, 0.0)
+
+    def remove_worker(self, worker_id: int) -> List[Lease]:
+        """Forget a worker and every lease still assigned to it"""
+        self.inflight.pop(worker_id, None)
+        self.remaining.pop(worker_id, None)
+        self.policy.remove(worker_id)
+        dropped = [
+            lid for lid, lease in self.leases.items() if lease.worker_id == worker_id
+        ]
+        return [self.leases.pop(lease_id) for lease_id in dropped]
+
+    def load(self, worker_id: int) -> float:
+        pending = self.remaining_work_weight * self.remaining[worker_id]
+        return self.inflight[worker_id] + pending
+
+    def loads(self) -> Dict[int, float]:
+        return {wid: self.load(wid) for wid in self.inflight}
+
+    def acquire(self, lease_id: str, worker_id: int, total_units: int) -> bool:
+        """Record a new in-flight request; returns False for unknown workers or duplicates"""
+        if worker_id not in self.inflight or lease_id in self.leases:
+            return False
+        self.leases[lease_id] = Lease(worker_id=worker_id, total_units=total_units)
+        self.inflight[worker_id] += 1
+        self.remaining[worker_id] += total_units
+        self._changed(worker_id)
+        return True
+
+    def start(self, lease_id: str, worker_id: int, total_units: int) -> Optional[Lease]:
+        """Mark a lease as streaming, acquiring it first if the Router never saw it"""
+        if lease_id in self.released:
+            # Reports are sent independently; this one was overtaken by the lease's end
+            return None
+        if lease_id not in self.leases and not self.acquire(
+            lease_id, worker_id, total_units
+        ):
+            return None
+        lease = self.leases[lease_id]
+        lease.started = True
+        lease.updated_at = time.monotonic()
+        return lease
+
+    def progress(self, lease_id: str, completed_units: int) -> Optional[Lease]:
+        lease = self.leases.get(lease_id)
+        if lease is None:
+            return None
+        before = lease.remaining_units
+        lease.completed_units = max(lease.completed_units, completed_units)
+        lease.updated_at = time.monotonic()
+        self.remaining[lease.worker_id] -= before - lease.remaining_units
+        self._changed(lease.worker_id)
+        return lease
+
+    def _forget_released(self, now: float):
+        while self.released:
+            oldest = next(iter(self.released.values()))
+            if now - oldest <= self.released_ttl:
+                break
+            self.released.popitem(last=False)
+
+    def release(self, lease_id: str) -> Optional[Lease]:
+        now = time.monotonic()
+        self._forget_released(now)
+        self.released[lease_id] = now
+        lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            return None
+        if lease.worker_id in self.inflight:
+            self.inflight[lease.worker_id] -= 1
+            self.remaining[lease.worker_id] -= lease.remaining_units
+            self._changed(lease.worker_id)
+        return lease
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Release leases whose end report was lost"""
+        now = time.monotonic() if now is None else now
+        expired = [
+            lid
+            for lid, lease in self.leases.items()
+            if now - lease.updated_at > self.lease_timeout
+        ]
+        for lease_id in expired:
+            self.release(lease_id)
+        if expired:
+            logger.warning(f"Expired {len(expired)} leases without an end report")
+        return expired
+
+
+class MembershipWatcher:
+    """Turns worker membership changes into join/leave events as they happen.
+
+    The client's instance list is a locally cached view kept current by the
+    runtime, so it is diffed at a short ``poll_interval`` as the baseline
+    source. ``refresh()`` can also be called whenever there is a reason to
+    believe membership changed, and ``suspect()`` removes a worker that
+    failed a connection right away, before the instance list catches up.
+    A suspected worker that is still listed after ``suspect_timeout``
+    seconds rejoins.
+    """
+
+    def __init__(
+        self, client, poll_interval: float = 1.0, suspect_timeout: float = 5.0
+    ):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.suspect_timeout = suspect_timeout
+        self.known: Set[int] = set()
+        self.members: Set[int] = set()
+        self.suspects: Dict[int, float] = {}
+        self.joins = 0
+        self.leaves = 0
+        self._events: asyncio.Queue = asyncio.Queue()
+
+    def _emit(self, kind: str, worker_id: int):
+        if kind == "join":
+            self.members.add(worker_id)
+            self.joins += 1
+        else:
+            self.members.discard(worker_id)
+            self.leaves += 1
+        self._events.put_nowait((kind, worker_id))
+
+    def refresh(self):
+        """Diff the instance list against the last view and emit changes"""
+        current = set(self.client.instance_ids())
+        now = time.monotonic()
+        for worker_id in current - self.known:
+            self._emit("join", worker_id)
+        for worker_id in self.known - current:
+            self.suspects.pop(worker_id, None)
+            if worker_id in self.members:
+                self._emit("leave", worker_id)
+        for worker_id, since in list(self.suspects.items()):
+            if now - since > self.suspect_timeout:
+                del self.suspects[worker_id]
+                self._emit("join", worker_id)
+        self.known = current
+
+    def suspect(self, worker_id: int):
+        """Stop routing to a worker that looks dead, ahead of the instance list"""
+        self.refresh()
+        if worker_id in self.members:
+            self.suspects[worker_id] = time.monotonic()
+            self._emit("leave", worker_id)
+
+    async def _poll(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing worker membership: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def events(self) -> AsyncIterator[Tuple[str, int]]:
+        """Yield ("join" | "leave", worker_id) events, starting the poller"""
+        poller = asyncio.create_task(self._poll())
+        try:
+            while True:
+                yield await self._events.get()
+        finally:
+            poller.cancel()
+
+
+def diff_loads(
+    previous: Dict[int, float], current: Dict[int, float]
+) -> Tuple[Dict[int, float], List[int]]:
+    """Return the changed loads and removed workers between two load views"""
+    changed = {wid: load for wid, load in current.items() if previous.get(wid) != load}
+    removed = [wid for wid in previous if wid not in current]
+    return changed, removed
+
+
+class LocalRoutingTable:
+    """Router load view replicated into a Middle replica for local decisions.
+
+    Updates arrive as full snapshots or deltas. Workers picked locally get
+    their load bumped by one until the next update from the Router, which
+    by then accounts for the stream through its start report.
+    """
+
+    def __init__(
+        self, max_staleness: float = 0.5, policy: Optional[SelectionPolicy] = None
+    ):
+        self.max_staleness = max_staleness
+        self.policy = policy or PowerOfTwoPolicy()
+        self.loads: Dict[int, float] = {}
+        self.version = -1
+        self.updated_at = 0.0
+
+    def apply(
+        self,
+        version: int,
+        loads: Dict[int, float],
+        removed: List[int],
+        full: bool = False,
+    ):
+        if full:
+            removed = [wid for wid in self.loads if wid not in loads]
+        elif version != self.version + 1:
+            # A delta was missed; keep serving the old view until it goes stale
+            logger.warning(f"Routing table gap: have {self.version}, got {version}")
+            return False
+        for worker_id in removed:
+            self.loads.pop(worker_id, None)
+            self.policy.remove(worker_id)
+        for worker_id, load in loads.items():
+            self.loads[worker_id] = load
+            self.policy.update(worker_id, load)
+        self.version = version
+        self.updated_at = time.monotonic()
+        return True
+
+    def touch(self, version: int):
+        """Record a heartbeat that confirms the current view is still current"""
+        if version == self.version:
+            self.updated_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        if not self.loads:
+            return False
+        return time.monotonic() - self.updated_at <= self.max_staleness
+
+    def select(self, key: Optional[str] = None) -> Optional[int]:
+        worker_id = self.policy.select(key)
+        if worker_id is not None:
+            self.loads[worker_id] += 1
+            self.policy.update(worker_id, self.loads[worker_id])
+        return worker_id
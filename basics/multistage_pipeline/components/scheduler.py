@@ -0,0 +1,169 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Hashable, List, Optional, Sequence
+
+from components.fair_queue import WeightedFairQueue
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Stream:
+    """Per-request state inside the scheduler"""
+
+    __slots__ = ("items", "position", "outputs", "cancelled", "flow")
+
+    def __init__(self, items: List[Any], flow: Hashable = None):
+        self.items = items
+        self.position = 0
+        self.outputs: asyncio.Queue = asyncio.Queue()
+        self.cancelled = False
+        self.flow = flow
+
+
+class StepBatchScheduler:
+    """Continuous batching: each step advances every active stream by one item.
+
+    ``step_fn`` receives the next item of every active stream and returns one
+    output per item; it may be a plain function or a coroutine function.
+    New streams join at step boundaries while fewer than ``max_batch_size``
+    are active, the rest wait in arrival order. When the scheduler is idle,
+    the first arrival waits up to ``max_wait_ms`` for others to batch with.
+
+    With a ``fair_queue``, the batch is chosen again at every step from all
+    unfinished streams, by each stream's flow, so a long stream cannot hold
+    a batch slot while short ones wait behind it.
+    """
+
+    def __init__(
+        self,
+        step_fn: Callable[[List[Any]], Sequence[Any]],
+        step_time: float = 0.0,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        fair_queue: Optional[WeightedFairQueue] = None,
+    ):
+        self.step_fn = step_fn
+        self.step_time = step_time
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.waiting: deque = deque()
+        self.fair_queue = fair_queue
+        self.active: List[_Stream] = []
+        self.steps = 0
+        self.items_processed = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def submit(
+        self, items: Sequence[Any], flow: Hashable = None
+    ) -> AsyncIterator[Any]:
+        """Queue a stream of items and yield their outputs as steps complete.
+
+        ``flow`` is only used with a fair queue.
+        """
+        if not items:
+            return
+        stream = _Stream(list(items), flow)
+        self._enqueue(stream)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        try:
+            while True:
+                output = await stream.outputs.get()
+                if output is _DONE:
+                    return
+                if isinstance(output, BaseException):
+                    raise output
+                yield output
+        finally:
+            # Consumer went away: the stream is dropped at the next step
+            stream.cancelled = True
+
+    def _enqueue(self, stream: _Stream):
+        if self.fair_queue is not None:
+            self.fair_queue.push(stream.flow, stream)
+        else:
+            self.waiting.append(stream)
+
+    def _pending(self) -> int:
+        return (
+            len(self.fair_queue) if self.fair_queue is not None else len(self.waiting)
+        )
+
+    def _admit(self):
+        if self.fair_queue is not None:
+            # Unfinished streams were put back after the last step
+            self.active = []
+            while self.fair_queue and len(self.active) < self.max_batch_size:
+                stream = self.fair_queue.pop()
+                if not stream.cancelled:
+                    self.active.append(stream)
+            return
+        self.active = [stream for stream in self.active if not stream.cancelled]
+        while self.waiting and len(self.active) < self.max_batch_size:
+            stream = self.waiting.popleft()
+            if not stream.cancelled:
+                self.active.append(stream)
+
+    async def _run(self):
+        while True:
+            if not self.active and not self._pending():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                if self.max_wait > 0 and self._pending() < self.max_batch_size:
+                    await asyncio.sleep(self.max_wait)
+            self._admit()
+            if not self.active:
+                continue
+            await self._step(self.active)
+
+    async def _step(self, batch: List[_Stream]):
+        items = [stream.items[stream.position] for stream in batch]
+        try:
+            if self.step_time > 0:
+                await asyncio.sleep(self.step_time)
+            outputs = self.step_fn(items)
+            if inspect.isawaitable(outputs):
+                outputs = await outputs
+        except Exception as e:
+            logger.error(f"Batch step failed for {len(batch)} streams: {e}")
+            for stream in batch:
+                stream.outputs.put_nowait(e)
+            self.active = []
+            return
+
+        self.steps += 1
+        self.items_processed += len(items)
+        remaining = []
+        for stream, output in zip(batch, outputs):
+            stream.position += 1
+            stream.outputs.put_nowait(output)
+            if stream.position >= len(stream.items):
+                stream.outputs.put_nowait(_DONE)
+            elif not stream.cancelled:
+                remaining.append(stream)
+        if self.fair_queue is not None:
+            for stream in remaining:
+                self.fair_queue.push(stream.flow, stream)
+            remaining = []
+        self.active = remaining
@@ -0,0 +1 @@
+../../common/streams.py
\ No newline at end of file
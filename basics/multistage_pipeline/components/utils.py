@@ -13,55 +13,102 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import logging
-from typing import Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+
 import msgspec
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
 class TextRequest(BaseModel):
     """Request model for text processing"""
+
     text: str
     request_id: str = "default_id"
     greeting: Optional[str] = None
+    deadline: Optional[
+        float
+    ] = None  # Absolute time.time() after which nobody waits for the result
+    priority: Optional[
+        str
+    ] = None  # Backend scheduling class, e.g. "interactive" or "batch"
+    tenant: Optional[
+        str
+    ] = None  # Requests of one class share the Backend fairly across tenants
 
 
 class TextResponse(BaseModel):
     """Response model for processed text"""
+
+    processed_text: str
+    request_id: str
+    worker_id: Optional[str] = None
+
+
+class TextRequestMsg(msgspec.Struct, omit_defaults=True):
+    """msgspec wire form of TextRequest"""
+
+    text: str
+    request_id: str = "default_id"
+    greeting: Optional[str] = None
+    deadline: Optional[float] = None
+    priority: Optional[str] = None
+    tenant: Optional[str] = None
+
+
+class TextResponseMsg(msgspec.Struct, omit_defaults=True):
+    """msgspec wire form of TextResponse"""
+
     processed_text: str
     request_id: str
     worker_id: Optional[str] = None
 
 
+class RouteRequest(BaseModel):
+    """Routing request sent from Middle to Router"""
+
+    text: str
+    lease_id: str
+    exclude: List[int] = []  # Workers already serving this request, e.g. when hedging
+    deadline: Optional[float] = None
+
+
+class WorkerReport(BaseModel):
+    """Stream lifecycle report sent from Middle to Router"""
+
+    lease_id: str
+    worker_id: int
+    event: str  # start, progress, end, error, cancelled, unreachable
+    total_units: int = 0
+    completed_units: int = 0
+
+
+class LoadUpdate(BaseModel):
+    """Worker load snapshot (full) or delta pushed from Router to Middle"""
+
+    version: int
+    full: bool = False
+    loads: Dict[int, float] = {}
+    removed: List[int] = []
+
+
 class QueueTask(msgspec.Struct, omit_defaults=True, dict=True):
     """Task structure for queue processing"""
+
     text: str
     request_id: str
     greeting: str = "Hello"
     source_worker: str = "unknown"
+    deadline: Optional[float] = None
+
+
+def split_words(text: str) -> list[str]:
+    """Split request text into the units the Backend processes one at a time."""
+    return text.split(",") if "," in text else text.split()
 
 
-async def check_required_workers(
-    workers_client,
-    required_workers: int,
-    poll_interval: int = 5,
-    tag: str = "",
-):
-    """Wait until the minimum number of workers are ready."""
-    worker_ids = workers_client.instance_ids()
-    num_workers = len(worker_ids)
-
-    while num_workers < required_workers:
-        print(
-            f"{tag} Waiting for workers to be ready. "
-            f"Current: {num_workers}, Required: {required_workers}"
-        )
-        await asyncio.sleep(poll_interval)
-        worker_ids = workers_client.instance_ids()
-        num_workers = len(worker_ids)
-
-    print(f"{tag} Workers ready: {worker_ids}")
-    return worker_ids
+def greet_word(greeting: str, word: str) -> str:
+    """Default Backend processing function for a single word"""
+    return f"{greeting} {word.strip()}!"
@@ -0,0 +1,70 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent stream load test for a running /generate endpoint.
+
+Sends the same request at increasing concurrency levels and compares the
+wall time of each level with the time of a single stream. A worker that
+streams asynchronously keeps the ratio near 1; a worker that blocks its
+event loop serializes streams and the ratio grows with concurrency.
+Works against hello_world, hello_world_configurable and simple_pipeline:
+
+    python load_test.py --url http://localhost:8000/generate --concurrency 1 4 16
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def stream_once(url: str, text: str) -> float:
+    """Send one request, read the whole stream and return its duration"""
+    body = json.dumps({"text": text}).encode()
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        while response.read(1024):
+            pass
+    return time.perf_counter() - start
+
+
+def run_level(url: str, text: str, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: stream_once(url, text), range(concurrency)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000/generate")
+    parser.add_argument("--text", default="world,universe,galaxy")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    single = stream_once(args.url, args.text)
+    print(f"single stream: {single:.2f}s")
+    print(f"{'streams':>8}{'wall s':>10}{'vs single':>11}")
+    for concurrency in args.concurrency:
+        wall = run_level(args.url, args.text, concurrency)
+        print(f"{concurrency:>8}{wall:>10.2f}{wall / single:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,15 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import logging
-import time
+from contextlib import nullcontext
 
-from dynamo.sdk.lib.config import ServiceConfig
-from dynamo.runtime.logging import configure_dynamo_logging
-from dynamo.sdk import api, endpoint, dynamo_context, service, depends, async_on_start
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from dynamo.runtime.logging import configure_dynamo_logging
+from dynamo.sdk import api, async_on_start, depends, dynamo_context, endpoint, service
+from dynamo.sdk.lib.config import ServiceConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,6 +47,7 @@ class RequestType(BaseModel):
 class ResponseType(BaseModel):
     text: str
 
+
 @service(
     dynamo={"namespace": "inference"},
 )
@@ -56,15 +60,46 @@ class Backend:
         self.sleep_time = config.get("Backend", {}).get("sleep_time", 1)
         logger.info(f"Backend config sleep_time: {self.sleep_time}")
 
+        # 0 means no limit on concurrent streams per worker
+        max_streams = config.get("Backend", {}).get("max_concurrent_streams", 0)
+        self.stream_slots = asyncio.Semaphore(max_streams) if max_streams > 0 else None
+        logger.info(f"Backend config max_concurrent_streams: {max_streams}")
+
+        # Streams abandoned by their caller, and the processing time that skipped
+        self.cancelled_requests = 0
+        self.saved_worker_seconds = 0.0
+
         logger.info("Starting backend")
 
     @endpoint()
     async def generate(self, words: str):
         logger.info(f"Backend received: {words}")
 
-        for word in words.split(","):
-            time.sleep(self.sleep_time)
-            yield f"{self.greeting} {word}!\n"
+        word_list = words.split(",")
+        produced = 0
+        try:
+            async with self.stream_slots or nullcontext():
+                for word in word_list:
+                    await asyncio.sleep(self.sleep_time)
+                    produced += 1
+                    yield f"{self.greeting} {word}!\n"
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client disconnected; stop here and free the stream slot
+            self.cancelled_requests += 1
+            self.saved_worker_seconds += (len(word_list) - produced) * self.sleep_time
+            logger.info(f"Backend cancelled after {produced}/{len(word_list)} words")
+            raise
+
+    @endpoint()
+    async def stats(self, request: str):
+        """Return cancellation counters as JSON"""
+        yield json.dumps(
+            {
+                "cancelled_requests": self.cancelled_requests,
+                "saved_worker_seconds": round(self.saved_worker_seconds, 3),
+            }
+        )
+
 
 @service(
     dynamo={"namespace": "inference"},
@@ -79,14 +114,21 @@ class Frontend:
         configure_dynamo_logging(service_name="Frontend")
 
         config = ServiceConfig.get_instance()
-        self.routing_mode = config.get("Frontend", {}).get("routing_mode", "round_robin")
+        self.routing_mode = config.get("Frontend", {}).get(
+            "routing_mode", "round_robin"
+        )
         logger.info(f"Frontend config routing_mode: {self.routing_mode}")
 
     @async_on_start
     async def async_init(self):
         runtime = dynamo_context["runtime"]
         backend_ns, backend_name = Backend.dynamo_address()
-        self.backend_client = await runtime.namespace(backend_ns).component(backend_name).endpoint("generate").client()
+        self.backend_client = (
+            await runtime.namespace(backend_ns)
+            .component(backend_name)
+            .endpoint("generate")
+            .client()
+        )
 
     # alternative syntax: @endpoint(transports=[DynamoTransport.HTTP])
     @api()
@@ -103,7 +145,13 @@ class Frontend:
             raise ValueError(f"Invalid routing mode: {self.routing_mode}")
 
         async def response_generator():
-            async for response in response_stream:
-                yield response.data()
+            try:
+                async for response in response_stream:
+                    yield response.data()
+            finally:
+                # Runs when the HTTP client disconnects, so the Backend stops too
+                aclose = getattr(response_stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
 
         return StreamingResponse(response_generator())
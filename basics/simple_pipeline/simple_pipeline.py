@@ -13,14 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-import time
 
-from dynamo.runtime.logging import configure_dynamo_logging
-from dynamo.sdk import api, endpoint, service, depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from dynamo.runtime.logging import configure_dynamo_logging
+from dynamo.sdk import api, depends, endpoint, service
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +44,7 @@ class RequestType(BaseModel):
 class ResponseType(BaseModel):
     text: str
 
+
 @service(
     dynamo={"namespace": "inference"},
 )
@@ -55,9 +57,10 @@ class Backend:
         logger.info(f"Backend received: {words}")
 
         for word in words.split(","):
-            time.sleep(1)
+            await asyncio.sleep(1)
             yield f"Hello {word}!\n"
 
+
 @service(
     dynamo={"namespace": "inference"},
 )